@@ -0,0 +1,51 @@
+"""Add partial indexes over ai_score recommendation buckets.
+
+Revision ID: add_ai_score_bucket_indexes
+Revises: add_user_last_lead_assigned_at
+Create Date: 2026-08-30
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision: str = "add_ai_score_bucket_indexes"
+down_revision: Union[str, None] = "add_user_last_lead_assigned_at"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # One tight partial index per recommendation bucket (thresholds mirror
+    # rule_based_score: >= 0.6 transfer, 0.3-0.6 nurture). Histogram and
+    # "hot leads" queries hit a small index instead of scanning the table.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_leads_score_hot "
+                "ON leads (ai_score) WHERE ai_score >= 0.6"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_leads_score_warm "
+                "ON leads (ai_score) WHERE ai_score >= 0.3 AND ai_score < 0.6"
+            )
+    else:
+        op.create_index(
+            "idx_leads_score_hot",
+            "leads",
+            ["ai_score"],
+            postgresql_where=sa.text("ai_score >= 0.6"),
+        )
+        op.create_index(
+            "idx_leads_score_warm",
+            "leads",
+            ["ai_score"],
+            postgresql_where=sa.text("ai_score >= 0.3 AND ai_score < 0.6"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_leads_score_warm", table_name="leads")
+    op.drop_index("idx_leads_score_hot", table_name="leads")
@@ -19,7 +19,29 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     op.add_column("leads", sa.Column("lost_reason", sa.String(length=32), nullable=True))
-    op.create_index("idx_leads_lost_reason", "leads", ["lost_reason"])
+    # Partial index: most leads never get a lost_reason, so indexing the NULL
+    # majority only bloats writes. Reporting filters (lost_reason = ?) imply
+    # NOT NULL and still use this index. Built CONCURRENTLY on Postgres so
+    # the leads table stays writable during the build.
+    #
+    # (lost_reason, created_at) keys serve time-windowed breakdowns; the
+    # INCLUDEd assigned_to_id lets per-manager loss reports run as
+    # index-only scans without heap lookups.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_leads_lost_reason "
+                "ON leads (lost_reason, created_at) INCLUDE (assigned_to_id) "
+                "WHERE lost_reason IS NOT NULL"
+            )
+    else:
+        op.create_index(
+            "idx_leads_lost_reason",
+            "leads",
+            ["lost_reason", "created_at"],
+            postgresql_include=["assigned_to_id"],
+            postgresql_where=sa.text("lost_reason IS NOT NULL"),
+        )
 
 
 def downgrade() -> None:
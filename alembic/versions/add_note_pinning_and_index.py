@@ -22,11 +22,38 @@ def upgrade() -> None:
         "lead_notes",
         sa.Column("is_pinned", sa.Boolean(), nullable=False, server_default=sa.text("false")),
     )
-    op.create_index("idx_lead_notes_is_pinned", "lead_notes", ["is_pinned"])
-    op.create_index("idx_lead_notes_note_type", "lead_notes", ["note_type"])
+    # Partial index instead of a plain boolean B-tree: only the ~1% pinned
+    # rows are indexed, and (lead_id, created_at) serves the actual access
+    # pattern "pinned notes for a lead, newest first".
+    # Composite (lead_id, note_type): queries filter by lead first, then by
+    # type; a single-column index on the low-cardinality note_type is rarely
+    # chosen by the planner. The leading column also covers lead_id-only
+    # lookups, so the standalone lead_id index becomes redundant.
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY avoids blocking writes during the index builds; it
+        # cannot run inside a transaction, hence the autocommit block.
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_lead_notes_pinned "
+                "ON lead_notes (lead_id, created_at) WHERE is_pinned = true"
+            )
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_lead_notes_lead_type "
+                "ON lead_notes (lead_id, note_type)"
+            )
+    else:
+        op.create_index(
+            "idx_lead_notes_pinned",
+            "lead_notes",
+            ["lead_id", "created_at"],
+            postgresql_where=sa.text("is_pinned = true"),
+        )
+        op.create_index("idx_lead_notes_lead_type", "lead_notes", ["lead_id", "note_type"])
+    op.drop_index("ix_lead_notes_lead_id", table_name="lead_notes")
 
 
 def downgrade() -> None:
-    op.drop_index("idx_lead_notes_note_type", table_name="lead_notes")
-    op.drop_index("idx_lead_notes_is_pinned", table_name="lead_notes")
+    op.create_index("ix_lead_notes_lead_id", "lead_notes", ["lead_id"])
+    op.drop_index("idx_lead_notes_lead_type", table_name="lead_notes")
+    op.drop_index("idx_lead_notes_pinned", table_name="lead_notes")
     op.drop_column("lead_notes", "is_pinned")
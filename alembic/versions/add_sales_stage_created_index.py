@@ -0,0 +1,41 @@
+"""Add covering index for stage-filtered, recency-ordered sale pagination.
+
+Revision ID: add_sales_stage_created_index
+Revises: add_user_domains_table
+Create Date: 2026-08-30
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision: str = "add_sales_stage_created_index"
+down_revision: Union[str, None] = "add_user_domains_table"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # SaleRepository.get_all filters by stage and pages by created_at DESC.
+    # Matching the index to that order lets the planner walk it and stop at
+    # LIMIT instead of sorting the whole filtered set; INCLUDE carries the
+    # paginated columns so Postgres can serve the page index-only.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_sales_stage_created_at "
+                "ON sales (stage, created_at DESC) INCLUDE (id, lead_id, amount)"
+            )
+    else:
+        op.create_index(
+            "ix_sales_stage_created_at",
+            "sales",
+            ["stage", sa.text("created_at DESC")],
+            postgresql_include=["id", "lead_id", "amount"],
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sales_stage_created_at", table_name="sales")
@@ -0,0 +1,45 @@
+"""Add normalized user_domains table and backfill from the CSV column.
+
+Revision ID: add_user_domains_table
+Revises: add_ai_score_bucket_indexes
+Create Date: 2026-08-30
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers
+revision: str = "add_user_domains_table"
+down_revision: Union[str, None] = "add_ai_score_bucket_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_domains",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("domain", sa.String(length=32), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "domain", name="uq_user_domains_user_domain"),
+    )
+    op.create_index("ix_user_domains_domain", "user_domains", ["domain"])
+
+    # Backfill: split the legacy CSV column ("FIRST,SECOND") into rows.
+    conn = op.get_bind()
+    rows = conn.execute(
+        sa.text("SELECT id, domains FROM users WHERE domains IS NOT NULL AND domains != ''")
+    ).fetchall()
+    insert = sa.text("INSERT INTO user_domains (user_id, domain) VALUES (:user_id, :domain)")
+    for user_id, csv in rows:
+        for domain in {part.strip() for part in csv.split(",") if part.strip()}:
+            conn.execute(insert, {"user_id": user_id, "domain": domain})
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_domains_domain", table_name="user_domains")
+    op.drop_table("user_domains")
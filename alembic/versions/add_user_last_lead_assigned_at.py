@@ -18,7 +18,22 @@ depends_on: Union[str, Sequence[str], None] = None
 
 def upgrade() -> None:
     op.add_column("users", sa.Column("last_lead_assigned_at", sa.DateTime(timezone=True), nullable=True))
-    op.create_index("idx_users_last_lead_assigned_at", "users", ["last_lead_assigned_at"])
+    # Round-robin picks the oldest-assigned *active* manager (ORDER BY ... ASC
+    # NULLS FIRST LIMIT 1), so index only active users. B-tree is kept: the
+    # column is rewritten on every assignment, which ruins BRIN correlation.
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_last_lead_assigned_at "
+                "ON users (last_lead_assigned_at) WHERE is_active = true"
+            )
+    else:
+        op.create_index(
+            "idx_users_last_lead_assigned_at",
+            "users",
+            ["last_lead_assigned_at"],
+            postgresql_where=sa.text("is_active = true"),
+        )
 
 
 def downgrade() -> None:
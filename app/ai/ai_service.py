@@ -24,7 +24,7 @@ from openai import AsyncOpenAI
 from app.core.config import settings
 from app.schemas.lead import AIAnalysisResult
 from app.ai.prompts import LEAD_ANALYSIS_SYSTEM_PROMPT, build_lead_analysis_prompt
-from app.ai.fallback_scorer import rule_based_score
+from app.ai.fallback_scorer import format_score, rule_based_score
 from app.models.lead import Lead
 from app.models.ai_log import AIAnalysisLog
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -223,7 +223,7 @@ class AIService:
             )
             fb = rule_based_score(lead)
             return AIAnalysisResult(
-                score=fb["score"],
-                recommendation=fb["recommendation"],
-                reason=fb["reason"],
+                score=format_score(fb.score),
+                recommendation=fb.recommendation,
+                reason=fb.reason,
             )
@@ -4,74 +4,152 @@ Fallback AI Scorer — Rule-Based
 Activated when OpenAI is unavailable. Produces a deterministic score baseline
 so the system degrades gracefully rather than crashing.
 """
+from bisect import bisect_right
+from dataclasses import dataclass
+from enum import IntFlag
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
 from app.models.lead import Lead, LeadSource, ColdStage
 
+# Weight tables frozen at import time so the hot path does plain lookups
+# instead of rebuilding dicts on every call.
+# Keep synchronized with current LeadSource enum (SCANNER/PARTNER/MANUAL)
+_SOURCE_WEIGHTS = {
+    LeadSource.PARTNER: 0.30,
+    LeadSource.SCANNER: 0.20,
+    LeadSource.MANUAL: 0.10,
+}
+_SOURCE_DEFAULT = 0.10
+
+_STAGE_WEIGHTS = {
+    ColdStage.QUALIFIED: 0.20,
+    ColdStage.CONTACTED: 0.10,
+    ColdStage.NEW: 0.0,
+}
+
+# Activity buckets: bisect_right into the sorted thresholds gives the bucket
+# index directly, replacing the old if/elif cascade on message_count.
+_ACT_THRESH = (2, 5, 10)
+_ACT_WEIGHTS = (0.0, 0.08, 0.15, 0.25)
+_ACT_TAGS = (None, "low-activity", "medium-activity", "high-activity")
 
-def rule_based_score(lead: Lead) -> dict:
+
+class Signal(IntFlag):
+    """Machine-readable scoring signals; mirrors the reason-string tags.
+
+    Analytics can aggregate over the int bitmask instead of parsing strings.
     """
-    Compute a lead quality score using pure rule-based logic.
-    Returns a dict with keys: score, recommendation, reason.
-    All scores are in [0.0, 1.0].
+    HIGH_ACTIVITY = 1
+    MED_ACTIVITY = 2
+    LOW_ACTIVITY = 4
+    FULL_CONTACT = 8
+    PARTIAL_CONTACT = 16
+    B2B = 32
+    DOMAIN = 64
+    STAGE_QUALIFIED = 128
+    STAGE_CONTACTED = 256
+
+
+_ACT_SIGNALS = (0, Signal.LOW_ACTIVITY, Signal.MED_ACTIVITY, Signal.HIGH_ACTIVITY)
+_STAGE_SIGNALS = tuple(
+    Signal.STAGE_QUALIFIED if stg is ColdStage.QUALIFIED
+    else Signal.STAGE_CONTACTED if stg is ColdStage.CONTACTED
+    else 0
+    for stg in ColdStage
+)
+
+# Positional views of the weight tables: LeadSource/ColdStage are str-valued
+# enums, so lookups go through the member-position maps once and the hot path
+# indexes flat tuples/arrays instead of hashing enum objects.
+_SOURCE_IDX = {src: i for i, src in enumerate(LeadSource)}
+_STAGE_IDX = {stg: i for i, stg in enumerate(ColdStage)}
+_SOURCE_VALUES = tuple(src.value for src in LeadSource)
+_STAGE_VALUES = tuple(stg.value for stg in ColdStage)
+_SOURCE_W_TUPLE = tuple(_SOURCE_WEIGHTS.get(src, _SOURCE_DEFAULT) for src in LeadSource)
+_STAGE_W_TUPLE = tuple(_STAGE_WEIGHTS.get(stg, 0.0) for stg in ColdStage)
+_SOURCE_W_ARR = np.array(
+    [_SOURCE_WEIGHTS.get(src, _SOURCE_DEFAULT) for src in LeadSource]
+)
+_STAGE_W_ARR = np.array([_STAGE_WEIGHTS.get(stg, 0.0) for stg in ColdStage])
+_ACT_THRESH_ARR = np.array(_ACT_THRESH)
+_ACT_W_ARR = np.array(_ACT_WEIGHTS)
+_ACT_SIG_ARR = np.array([int(s) for s in _ACT_SIGNALS], dtype=np.int32)
+_STAGE_SIG_ARR = np.array([int(s) for s in _STAGE_SIGNALS], dtype=np.int32)
+
+
+def format_score(score: float) -> float:
+    """Round a raw score for persistence/JSON. Kept out of the scoring path."""
+    return round(score, 3)
+
+
+@dataclass(slots=True, frozen=True)
+class FallbackScore:
+    """Rule-based scoring result. Slots avoid per-call __dict__ allocation."""
+
+    score: float
+    recommendation: str
+    reason: str | None
+    signals: int = 0
+
+    def to_dict(self) -> dict:
+        """Dict form for JSON-serializing callers."""
+        return {
+            "score": self.score,
+            "recommendation": self.recommendation,
+            "reason": self.reason,
+            "signals": self.signals,
+        }
+
+
+@lru_cache(maxsize=4096)
+def _score_core(
+    src_idx: int,
+    act_bucket: int,
+    has_email: bool,
+    has_phone: bool,
+    is_b2b: bool,
+    has_domain: bool,
+    stage_idx: int,
+) -> tuple[float, str, int]:
     """
-    score = 0.0
-    reasons: list[str] = []
-
-    # ── Source weight ─────────────────────────────
-    # Keep synchronized with current LeadSource enum (SCANNER/PARTNER/MANUAL)
-    source_weights = {
-        LeadSource.PARTNER: 0.30,
-        LeadSource.SCANNER: 0.20,
-        LeadSource.MANUAL: 0.10,
-    }
-    src_w = source_weights.get(lead.source, 0.10)
-    score += src_w
-    reasons.append(f"source={lead.source.value}(+{src_w:.2f})")
-
-    # ── Activity (message count) ──────────────────
-    mc = lead.message_count if lead.message_count else 0
-    if mc >= 10:
-        score += 0.25
-        reasons.append("high-activity")
-    elif mc >= 5:
-        score += 0.15
-        reasons.append("medium-activity")
-    elif mc >= 2:
-        score += 0.08
-        reasons.append("low-activity")
-
-    # ── Contact completeness ──────────────────────
-    email = getattr(lead, "email", None)
-    phone = getattr(lead, "phone", None)
-    if email and phone:
+    Pure cached core: maps the small signal tuple to
+    (score, recommendation, signals bitmask).
+    The key space is tiny (3 sources × 4 buckets × 2^4 flags × 5 stages), so
+    repeat scoring of a backlog degenerates to dict hits. Keys are plain ints
+    and bools; enum members are resolved to positions in _signal_key.
+
+    Deliberately not JIT/AOT-compiled: the lru_cache bounds steady-state work
+    to one tuple hash, and batch callers go through rule_based_score_batch.
+    """
+    score = _SOURCE_W_TUPLE[src_idx]
+    score += _ACT_WEIGHTS[act_bucket]
+    signals = int(_ACT_SIGNALS[act_bucket])
+
+    if has_email and has_phone:
         score += 0.15
-        reasons.append("full-contact")
-    elif email or phone:
+        signals |= Signal.FULL_CONTACT
+    elif has_email or has_phone:
         score += 0.07
-        reasons.append("partial-contact")
+        signals |= Signal.PARTIAL_CONTACT
 
-    # ── B2B qualification ─────────────────────────
-    if getattr(lead, "company", None) and getattr(lead, "position", None):
+    if is_b2b:
         score += 0.10
-        reasons.append("b2b-qualified")
+        signals |= Signal.B2B
 
-    # ── Business domain ───────────────────────────
-    if lead.business_domain:
+    if has_domain:
         score += 0.15
-        reasons.append("domain-set")
-
-    # ── Stage weight ──────────────────────────────
-    stage_weights = {
-        ColdStage.QUALIFIED: 0.20,
-        ColdStage.CONTACTED: 0.10,
-        ColdStage.NEW: 0.0,
-    }
-    stg_w = stage_weights.get(lead.stage, 0.0)
-    score += stg_w
-    if stg_w > 0:
-        reasons.append(f"stage={lead.stage.value}(+{stg_w:.2f})")
+        signals |= Signal.DOMAIN
 
-    # Cap at 1.0
-    score = round(min(score, 1.0), 3)
+    score += _STAGE_W_TUPLE[stage_idx]
+    signals |= _STAGE_SIGNALS[stage_idx]
+
+    # Cap at 1.0. No earlier short-circuit is possible: the terms above sum
+    # to at most 0.95 before stage weight, so only the total can exceed 1.0.
+    # The raw float is kept; callers round via format_score() when serializing.
+    score = min(score, 1.0)
 
     if score >= 0.6:
         recommendation = "transfer_to_sales"
@@ -80,10 +158,186 @@ def rule_based_score(lead: Lead) -> dict:
     else:
         recommendation = "lost"
 
-    reason = f"[RULE-BASED / AI OFFLINE] Signals: {', '.join(reasons) or 'none'}. Score: {score:.2f}."
+    return score, recommendation, int(signals)
+
+
+@lru_cache(maxsize=4096)
+def _reason_core(
+    src_idx: int,
+    act_bucket: int,
+    has_email: bool,
+    has_phone: bool,
+    is_b2b: bool,
+    has_domain: bool,
+    stage_idx: int,
+) -> str:
+    """Cached reason-string assembly for the same signal tuple."""
+    score, _, _ = _score_core(
+        src_idx, act_bucket, has_email, has_phone, is_b2b, has_domain, stage_idx
+    )
+    src_w = _SOURCE_W_TUPLE[src_idx]
+    parts = [f"source={_SOURCE_VALUES[src_idx]}(+{src_w:.2f})"]
+    append = parts.append  # localize the bound method
+
+    if _ACT_TAGS[act_bucket]:
+        append(_ACT_TAGS[act_bucket])
+
+    if has_email and has_phone:
+        append("full-contact")
+    elif has_email or has_phone:
+        append("partial-contact")
+
+    if is_b2b:
+        append("b2b-qualified")
+
+    if has_domain:
+        append("domain-set")
+
+    stg_w = _STAGE_W_TUPLE[stage_idx]
+    if stg_w > 0:
+        append(f"stage={_STAGE_VALUES[stage_idx]}(+{stg_w:.2f})")
+
+    # Single concatenation instead of join + wrapping f-string
+    return (
+        "[RULE-BASED / AI OFFLINE] Signals: "
+        + (", ".join(parts) or "none")
+        + f". Score: {score:.2f}."
+    )
+
+
+def _signal_key(lead: Lead) -> tuple[int, int, bool, bool, bool, bool, int]:
+    """Extract the hashable signal tuple rule scoring depends on."""
+    return (
+        _SOURCE_IDX[lead.source],
+        bisect_right(_ACT_THRESH, lead.message_count or 0),
+        bool(lead.email),
+        bool(lead.phone),
+        # company/position are not Lead columns yet — getattr stays until they are
+        bool(getattr(lead, "company", None) and getattr(lead, "position", None)),
+        bool(lead.business_domain),
+        _STAGE_IDX[lead.stage],
+    )
+
+
+def rule_based_score(lead: Lead, *, with_reason: bool = True) -> FallbackScore:
+    """
+    Compute a lead quality score using pure rule-based logic.
+    Returns a FallbackScore(score, recommendation, reason).
+    All scores are in [0.0, 1.0].
+
+    Pass with_reason=False to skip reason-string assembly (the f-string
+    formatting dominates the per-call cost); reason is then None.
+    """
+    key = _signal_key(lead)
+    score, recommendation, signals = _score_core(*key)
+    return FallbackScore(
+        score=score,
+        recommendation=recommendation,
+        reason=_reason_core(*key) if with_reason else None,
+        signals=signals,
+    )
+
+
+def rule_based_score_batch(
+    leads: Sequence[Lead], with_reasons: bool = False
+) -> list[FallbackScore]:
+    """
+    Vectorized equivalent of rule_based_score for scoring many leads at once
+    (e.g. draining a backlog after an OpenAI outage). The arithmetic runs in
+    NumPy instead of per-lead Python branches.
+
+    Reason strings are only built when with_reasons=True; callers that just
+    persist score/recommendation skip that cost entirely (reason is None).
+    """
+    n = len(leads)
+    if n == 0:
+        return []
+
+    src_idx = np.fromiter(
+        (_SOURCE_IDX[l.source] for l in leads), dtype=np.intp, count=n
+    )
+    stg_idx = np.fromiter(
+        (_STAGE_IDX[l.stage] for l in leads), dtype=np.intp, count=n
+    )
+    mc = np.fromiter(
+        (l.message_count or 0 for l in leads), dtype=np.int32, count=n
+    )
+    has_email = np.fromiter(
+        (bool(l.email) for l in leads), dtype=bool, count=n
+    )
+    has_phone = np.fromiter(
+        (bool(l.phone) for l in leads), dtype=bool, count=n
+    )
+    b2b = np.fromiter(
+        (bool(getattr(l, "company", None) and getattr(l, "position", None)) for l in leads),
+        dtype=bool,
+        count=n,
+    )
+    has_domain = np.fromiter(
+        (bool(l.business_domain) for l in leads), dtype=bool, count=n
+    )
+
+    src_w = _SOURCE_W_ARR[src_idx]
+    stg_w = _STAGE_W_ARR[stg_idx]
+    act_bucket = np.searchsorted(_ACT_THRESH_ARR, mc, side="right")
+    act_w = _ACT_W_ARR[act_bucket]
+    full_contact = has_email & has_phone
+    partial_contact = has_email | has_phone
+    contact_w = np.where(full_contact, 0.15, np.where(partial_contact, 0.07, 0.0))
+
+    scores = src_w + stg_w + act_w + contact_w + b2b * 0.10 + has_domain * 0.15
+    scores = np.minimum(scores, 1.0)
+
+    signals = (
+        _ACT_SIG_ARR[act_bucket]
+        | np.where(full_contact, int(Signal.FULL_CONTACT),
+                   np.where(partial_contact, int(Signal.PARTIAL_CONTACT), 0))
+        | b2b * int(Signal.B2B)
+        | has_domain * int(Signal.DOMAIN)
+        | _STAGE_SIG_ARR[stg_idx]
+    )
+
+    recommendations = np.select(
+        [scores >= 0.6, scores >= 0.3],
+        ["transfer_to_sales", "continue_nurturing"],
+        "lost",
+    )
+
+    if not with_reasons:
+        return [
+            FallbackScore(score=float(s), recommendation=str(r), reason=None, signals=int(g))
+            for s, r, g in zip(scores, recommendations, signals)
+        ]
 
-    return {
-        "score": score,
-        "recommendation": recommendation,
-        "reason": reason,
-    }
+    # Text path: per-lead formatting is unavoidable, but reuses the
+    # already-computed component arrays instead of re-branching.
+    results = []
+    for i, lead in enumerate(leads):
+        reasons = [f"source={_SOURCE_VALUES[src_idx[i]]}(+{src_w[i]:.2f})"]
+        if act_w[i] >= 0.25:
+            reasons.append("high-activity")
+        elif act_w[i] >= 0.15:
+            reasons.append("medium-activity")
+        elif act_w[i] >= 0.08:
+            reasons.append("low-activity")
+        if contact_w[i] >= 0.15:
+            reasons.append("full-contact")
+        elif contact_w[i] >= 0.07:
+            reasons.append("partial-contact")
+        if b2b[i]:
+            reasons.append("b2b-qualified")
+        if has_domain[i]:
+            reasons.append("domain-set")
+        if stg_w[i] > 0:
+            reasons.append(f"stage={_STAGE_VALUES[stg_idx[i]]}(+{stg_w[i]:.2f})")
+        score = float(scores[i])
+        results.append(FallbackScore(
+            score=score,
+            recommendation=str(recommendations[i]),
+            reason=(
+                f"[RULE-BASED / AI OFFLINE] Signals: {', '.join(reasons) or 'none'}. "
+                f"Score: {score:.2f}."
+            ),
+            signals=int(signals[i]),
+        ))
+    return results
@@ -10,7 +10,7 @@ from io import BytesIO
 from typing import Optional
 
 import httpx
-from app.ai.voice_ai_manager import voice_ai, Intent, IntentDetector
+from app.ai.voice_ai_manager import get_voice_ai, Intent, IntentDetector
 
 logger = logging.getLogger(__name__)
 
@@ -59,7 +59,7 @@ class UnifiedAIService:
     
     def get_user_context(self, user_id: int) -> dict:
         """Get context for user from unified VoiceAIManager."""
-        ctx = voice_ai.get_context(user_id)
+        ctx = get_voice_ai().get_context(user_id)
         return {
             "last_lead_id": ctx.last_lead_id,
             "last_lead_name": ctx.last_lead_name,
@@ -70,22 +70,22 @@ class UnifiedAIService:
     def update_context(self, user_id: int, lead_id: int = None, lead_name: str = None, action: str = None):
         """Update user context in VoiceAIManager."""
         if lead_id:
-            voice_ai.update_context_lead(user_id, lead_id, lead_name)
+            get_voice_ai().update_context_lead(user_id, lead_id, lead_name)
         if action:
-            ctx = voice_ai.get_context(user_id)
+            ctx = get_voice_ai().get_context(user_id)
             ctx.last_action = action
-    
+
     def clear_context(self, user_id: int):
         """Clear user context."""
-        voice_ai._user_contexts.pop(user_id, None)
-    
+        get_voice_ai()._user_contexts.pop(user_id, None)
+
     def resolve_pronoun(self, text: str, user_id: int):
         """Resolve pronouns using VoiceAIManager context resolver."""
-        return voice_ai.resolve_pronoun(text, user_id)
+        return get_voice_ai().resolve_pronoun(text, user_id)
 
     def assess_transcription_quality(self, text: str) -> dict:
         """Expose voice transcription quality assessment from VoiceAIManager."""
-        return voice_ai.assess_transcription_quality(text)
+        return get_voice_ai().assess_transcription_quality(text)
     
     # ==================== VOICE PROCESSING ====================
     
@@ -259,7 +259,7 @@ class UnifiedAIService:
     
     def parse_command(self, text: str, user_id: int = None) -> dict:
         """Parse command through VoiceAIManager to keep one NLU source of truth."""
-        ctx = voice_ai.get_context(user_id) if user_id else None
+        ctx = get_voice_ai().get_context(user_id) if user_id else None
         action = IntentDetector.detect(text, ctx)
 
         action_map = {
@@ -10,18 +10,38 @@ This module combines:
 
 Single source of truth for all voice/text AI interactions.
 """
+import asyncio
+import io
 import os
 import re
+import time
+import json
 import logging
 from typing import Optional, Any
-from dataclasses import dataclass, field
+from collections import OrderedDict, deque
+from dataclasses import astuple, dataclass, field
+from functools import lru_cache
 from enum import Enum
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import httpx
 
 logger = logging.getLogger(__name__)
 
+# orjson is 2-5x faster than stdlib json; fall back transparently when absent.
+try:
+    import orjson
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _json_loads = json.loads
+
 # Try to import faster-whisper
 try:
     from faster_whisper import WhisperModel
@@ -30,11 +50,160 @@ except ImportError:
     FASTER_WHISPER_AVAILABLE = False
     logger.warning("faster-whisper not installed. Install for local offline transcription.")
 
+# BatchedInferencePipeline landed in faster-whisper 1.1; fall back to the
+# plain model on older installs.
+try:
+    from faster_whisper import BatchedInferencePipeline
+except ImportError:
+    BatchedInferencePipeline = None
+
+
+# ─────────────────────────────────────────────────────────────
+# Precompiled patterns (hot NLU path — avoid per-call re cache lookups)
+# ─────────────────────────────────────────────────────────────
+
+# One alternation instead of five sequential patterns: a non-matching text
+# is scanned once, not five times. Alternatives ordered longest/most
+# specific first so leftmost matching picks the intuitive prefix.
+_LEAD_ID_RE = re.compile(r'(?:(?:до|для)\s*лід[ау]\s*#?|лід\s*#?|lead\s*#?|#)(\d+)')
+_PHONE_PATTERNS = tuple(re.compile(p) for p in (r'\+?380\d{9}', r'\+?\d{10,12}'))
+_EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+\.\w+')
+_NAME_PATTERNS = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'лід[ау]?[.,]?\s*([А-Яа-яёЇїІіЄєA-Za-z]+(?:\s+[А-Яа-яёЇїІіЄєA-Za-z]+)?)',
+    r'додай\s+(?:нового\s+)?ліда[.,]?\s*([А-Яа-яёЇїІіЄєA-Za-z]+(?:\s+[А-Яа-яёЇїІіЄєA-Za-z]+)?)',
+))
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_WEIRD_RE = re.compile(r"[^\w\s\#\+\-\.@,:;!?іїєґІЇЄҐа-яА-Яa-zA-Z0-9]")
+_REPEAT_RE = re.compile(r"(.)\1{4,}")
+
+
+def _compile_literal_scanner(literals) -> tuple["re.Pattern[str]", dict[str, tuple[str, ...]]]:
+    """
+    Build a single-pass scanner for a set of literals: a longest-first
+    lookahead alternation visits every start position, and the prefix-closure
+    map recovers shorter literals shadowed by a longer one at the same spot.
+    """
+    ordered = sorted(set(literals), key=len, reverse=True)
+    scan_re = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+    closure = {lit: tuple(o for o in ordered if lit.startswith(o)) for lit in ordered}
+    return scan_re, closure
+
+
+def _scan_literal_hits(
+    scan_re: "re.Pattern[str]", closure: dict[str, tuple[str, ...]], text: str
+) -> set[str]:
+    """Return the set of scanner literals present in text (one linear pass)."""
+    hits: set[str] = set()
+    for m in scan_re.finditer(text):
+        hits.update(closure[m.group(1)])
+    return hits
+
+
+# Slot literals resolved in one tagged scan instead of per-slot `in` ladders.
+# Order within each slot mirrors the old elif priority.
+_SOURCE_TAGS = (("SCANNER", ("сканер", "scanner")), ("PARTNER", ("партнер", "partner")))
+_DOMAIN_TAGS = (
+    ("FIRST", ("перший", "first")),
+    ("SECOND", ("другий", "second")),
+    ("THIRD", ("третій", "third")),
+)
+_PRONOUN_LITERALS = (
+    "того ліда", "того", "його", "йому", "нього", "неї", "останнього", "останньому",
+    "that lead", "that one", "the previous", "him",
+)
+_SEARCH_VERBS = ("знайди", "шукай", "search", "find")
+_NOTE_VERBS = ("додай нотатку", "запиши", "нотатка")
+
+# Confirmation messages as pre-parsed templates: format_map on a constant
+# beats reassembling the multi-line HTML f-string on every confirmation.
+_CONFIRM_FOOTER = "<i>Напишіть 'так' для підтвердження або 'ні' для скасування.</i>"
+_CONFIRM_CREATE_TPL = (
+    "📋 <b>ПІДТВЕРДЖЕННЯ</b>\n\n"
+    "Створити ліда?\n\n"
+    "👤 <b>Ім'я:</b> {lead_name}\n"
+    "📞 <b>Телефон:</b> {phone}\n"
+    "📧 <b>Email:</b> {email}\n"
+    "📡 <b>Джерело:</b> {source}\n\n" + _CONFIRM_FOOTER
+)
+_CONFIRM_DELETE_TPL = (
+    "⚠️ <b>ВИДАЛЕННЯ ЛІДА #{lead_id}</b>\n\n"
+    "Цю дію неможливо відновити!\n\n" + _CONFIRM_FOOTER
+)
+_CONFIRM_EDIT_TPL = (
+    "✏️ <b>ПІДТВЕРДЖЕННЯ ОНОВЛЕННЯ</b>\n\n"
+    "Оновити ліда #{lead_id}?\n\n" + _CONFIRM_FOOTER
+)
+
+
+# Confirm/cancel vocabulary, matched against whole tokens: hash-set
+# intersection beats a substring probe per word and stops "так" firing
+# inside unrelated words.
+CONFIRM_WORDS = frozenset({"так", "yes", "підтверджую", "confirm", "ок", "окей"})
+CANCEL_WORDS = frozenset({"ні", "no", "скасуй", "cancel", "відміна"})
+
+_TAG_SCAN_RE, _TAG_CLOSURE = _compile_literal_scanner(
+    [lit for _, lits in _SOURCE_TAGS + _DOMAIN_TAGS for lit in lits]
+    + list(_PRONOUN_LITERALS)
+    + list(_SEARCH_VERBS)
+    + list(_NOTE_VERBS)
+)
+
+
+def _scan_tags(text_lower: str) -> dict:
+    """Resolve source/domain/pronoun/verb slots in a single pass."""
+    hits = _scan_literal_hits(_TAG_SCAN_RE, _TAG_CLOSURE, text_lower)
+    tags = {
+        "source": None,
+        "domain": None,
+        "pronoun": False,
+        "search_verb": None,
+        "note_verb": None,
+    }
+    for value, lits in _SOURCE_TAGS:
+        if any(lit in hits for lit in lits):
+            tags["source"] = value
+            break
+    for value, lits in _DOMAIN_TAGS:
+        if any(lit in hits for lit in lits):
+            tags["domain"] = value
+            break
+    tags["pronoun"] = any(lit in hits for lit in _PRONOUN_LITERALS)
+    for verb in _SEARCH_VERBS:
+        if verb in hits:
+            tags["search_verb"] = verb
+            break
+    for verb in _NOTE_VERBS:
+        if verb in hits:
+            tags["note_verb"] = verb
+            break
+    return tags
+
 
 # ─────────────────────────────────────────────────────────────
 # Data Classes
 # ─────────────────────────────────────────────────────────────
 
+@dataclass(slots=True)
+class ProcessedText:
+    """
+    Per-turn text view built once and threaded through the NLU path, so
+    lowercasing, tokenization and the tagged scan are not repeated by
+    resolve_pronoun / detect / _extract_entities.
+    """
+    raw: str
+    lower: str
+    words: list
+    tags: dict
+
+    @classmethod
+    def of(cls, text: "str | ProcessedText") -> "ProcessedText":
+        """Wrap raw text, or pass an existing ProcessedText through."""
+        if isinstance(text, cls):
+            return text
+        lower = text.lower()
+        return cls(raw=text, lower=lower, words=_WORD_RE.findall(lower), tags=_scan_tags(lower))
+
+
 class Intent(Enum):
     """All possible user intents."""
     CREATE_LEAD = "create_lead"
@@ -53,7 +222,7 @@ class Intent(Enum):
     CANCEL = "cancel"
 
 
-@dataclass
+@dataclass(slots=True)
 class Entities:
     """Extracted entities from user input."""
     lead_id: Optional[int] = None
@@ -67,7 +236,7 @@ class Entities:
     search_query: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Action:
     """Represents a user action to execute."""
     intent: Intent
@@ -77,7 +246,21 @@ class Action:
     original_text: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
+class _ActionResponse:
+    """
+    Intermediate response built per intent. Slots layout with fixed fields
+    replaces the throwaway dict (and the .get() probes on it) that used to
+    sit between _build_action_response and _execute_action.
+    """
+    type: str = "text"
+    text: str = ""
+    keyboard: Any = None
+    followup_hint: Optional[str] = None
+    suggestions: tuple = ()
+
+
+@dataclass(slots=True)
 class ConversationTurn:
     """Single turn in conversation."""
     timestamp: datetime
@@ -86,7 +269,7 @@ class ConversationTurn:
     bot_response: str
 
 
-@dataclass
+@dataclass(slots=True)
 class UserContext:
     """User conversation context."""
     user_id: int
@@ -94,16 +277,18 @@ class UserContext:
     last_lead_name: Optional[str] = None
     last_action: Optional[str] = None
     confirmation_pending: Optional[Action] = None
-    conversation_history: list = field(default_factory=list)
+    # deque(maxlen=10) trims in place instead of re-slicing the list each turn
+    conversation_history: deque = field(default_factory=lambda: deque(maxlen=10))
     state: str = "idle"  # idle, awaiting_confirmation, editing
-    last_seen_at: datetime = field(default_factory=datetime.now)
-    
+    # Monotonic float seconds, not datetime: TTL math only needs relative
+    # time, and time.monotonic() skips the wallclock/tzinfo allocation on
+    # every turn. ConversationTurn.timestamp stays a datetime for display.
+    last_seen_at: float = field(default_factory=time.monotonic)
+
     def add_turn(self, turn: ConversationTurn):
         """Add turn to history, keep last 10."""
         self.conversation_history.append(turn)
-        if len(self.conversation_history) > 10:
-            self.conversation_history = self.conversation_history[-10:]
-        self.last_seen_at = datetime.now()
+        self.last_seen_at = time.monotonic()
 
 
 # ─────────────────────────────────────────────────────────────
@@ -168,143 +353,228 @@ class IntentDetector:
     }
     
     @classmethod
-    def detect(cls, text: str, current_context: Optional[UserContext] = None) -> Action:
-        """Detect intent from text with context awareness."""
-        text_lower = text.lower()
-        
-        # Try exact phrase matching first (highest confidence)
-        for intent, pattern_data in cls.PATTERNS.items():
-            for phrase in pattern_data.get("phrases", []):
-                if phrase in text_lower:
-                    entities = cls._extract_entities(text)
-                    # Use context to fill missing lead_id
-                    if current_context and not entities.lead_id:
-                        entities.lead_id = current_context.last_lead_id
-                    return Action(
-                        intent=intent,
-                        entities=entities,
-                        confidence=0.9,
-                        original_text=text
-                    )
-        
-        # Try keyword + verb combination
+    def _build_matcher(cls) -> tuple[dict, dict, "re.Pattern[str]"]:
+        """
+        Flatten PATTERNS into a single-pass literal matcher, built once at
+        class load. One scan over the text replaces ~60 substring checks.
+
+        The lookahead alternation (longest literal first) visits every start
+        position; when two literals match at the same position the shorter is
+        a prefix of the longer, so the prefix-closure map recovers it.
+        """
+        literal_tags: dict[str, list[tuple[Intent, str]]] = {}
         for intent, pattern_data in cls.PATTERNS.items():
-            keywords = pattern_data.get("keywords", [])
-            verbs = pattern_data.get("verbs", [])
-            
-            has_keyword = any(k in text_lower for k in keywords)
-            has_verb = any(v in text_lower for v in verbs)
-            
-            if has_keyword and has_verb:
-                entities = cls._extract_entities(text)
-                if current_context and not entities.lead_id:
-                    entities.lead_id = current_context.last_lead_id
-                return Action(
-                    intent=intent,
-                    entities=entities,
-                    confidence=0.8,
-                    original_text=text
-                )
-        
+            for kind in ("phrases", "keywords", "verbs"):
+                for lit in pattern_data.get(kind, []):
+                    literal_tags.setdefault(lit, []).append((intent, kind))
+        scan_re, prefix_closure = _compile_literal_scanner(literal_tags)
+        return literal_tags, prefix_closure, scan_re
+
+    @classmethod
+    def _match_intents(cls, text_lower: str) -> dict[Intent, set[str]]:
+        """Single scan: which pattern kinds (phrase/keyword/verb) hit per intent."""
+        hits = _scan_literal_hits(cls._SCAN_RE, cls._PREFIX_CLOSURE, text_lower)
+        matched: dict[Intent, set[str]] = {}
+        for lit in hits:
+            for intent, kind in cls._LITERAL_TAGS[lit]:
+                matched.setdefault(intent, set()).add(kind)
+        return matched
+
+    @classmethod
+    def detect(cls, text: "str | ProcessedText", current_context: Optional[UserContext] = None) -> Action:
+        """Detect intent from text with context awareness."""
+        raw = text.raw if isinstance(text, ProcessedText) else text
+        intent, confidence, entity_fields = cls._detect_core(raw)
+        entities = Entities(*entity_fields)
+        # Use context to fill missing lead_id (applied outside the cache so
+        # the memoized core stays context-free)
+        if current_context and not entities.lead_id:
+            entities.lead_id = current_context.last_lead_id
+        return Action(
+            intent=intent,
+            entities=entities,
+            confidence=confidence,
+            original_text=raw,
+        )
+
+    @classmethod
+    @lru_cache(maxsize=1024)
+    def _detect_core(cls, raw: str) -> tuple[Intent, float, tuple]:
+        """
+        Context-free detection, memoized per input text. Short commands
+        ("покажи ліди", "так", "статистика") repeat constantly, so hot
+        phrases skip the literal scan and entity regexes entirely. Entities
+        is mutable — the cache holds its field tuple, never the instance.
+        """
+        pt = ProcessedText.of(raw)
+
+        # Cheap prefilter: if the text shares no first character with any
+        # intent/confirm/cancel literal, nothing below can match — skip the
+        # whole scan and go straight to the AI fallback path.
+        if not cls._TRIGGER_CHARS.intersection(pt.lower):
+            return Intent.UNKNOWN, 0.3, astuple(cls._extract_entities(pt))
+
+        matched = cls._match_intents(pt.lower)
+
+        # Exact phrase matching first (highest confidence), in PATTERNS order
+        for intent in cls.PATTERNS:
+            if "phrases" in matched.get(intent, ()):
+                return intent, 0.9, astuple(cls._extract_entities(pt))
+
+        # Then keyword + verb combination
+        for intent in cls.PATTERNS:
+            kinds = matched.get(intent, ())
+            if "keywords" in kinds and "verbs" in kinds:
+                return intent, 0.8, astuple(cls._extract_entities(pt))
+
         # Handle confirmation/cancel keywords
-        if any(w in text_lower for w in ["так", "так", "yes", "підтверджую", "confirm", "ок", "окей"]):
-            return Action(Intent.CONFIRM, Entities(), 0.95, original_text=text)
-        if any(w in text_lower for w in ["ні", "no", "скасуй", "cancel", "відміна"]):
-            return Action(Intent.CANCEL, Entities(), 0.95, original_text=text)
-        
+        if CONFIRM_WORDS.intersection(pt.words):
+            return Intent.CONFIRM, 0.95, astuple(Entities())
+        if CANCEL_WORDS.intersection(pt.words):
+            return Intent.CANCEL, 0.95, astuple(Entities())
+
         # Default to unknown - will use AI fallback
-        entities = cls._extract_entities(text)
-        return Action(Intent.UNKNOWN, entities, 0.3, original_text=text)
-    
+        return Intent.UNKNOWN, 0.3, astuple(cls._extract_entities(pt))
+
     @staticmethod
-    def _extract_entities(text: str) -> Entities:
+    def _extract_entities(text: "str | ProcessedText") -> Entities:
         """Extract entities from text."""
+        pt = ProcessedText.of(text)
         entities = Entities()
-        text_lower = text.lower()
+        text = pt.raw
+        text_lower = pt.lower
         
         # Extract lead ID
-        lead_patterns = [
-            r'лід\s*#?(\d+)',
-            r'lead\s*#?(\d+)',
-            r'до\s*лід[ау]\s*#?(\d+)',
-            r'для\s*лід[ау]\s*#?(\d+)',
-            r'#(\d+)',
-        ]
-        for pattern in lead_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                try:
-                    entities.lead_id = int(match.group(1))
-                    break
-                except:
-                    pass
-        
+        match = _LEAD_ID_RE.search(text_lower)
+        if match:
+            # Capture group is (\d+), so int() cannot raise here
+            entities.lead_id = int(match.group(1))
+
         # Extract phone
-        phone_patterns = [r'\+?380\d{9}', r'\+?\d{10,12}']
-        for pattern in phone_patterns:
-            match = re.search(pattern, text)
+        for pattern in _PHONE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 entities.phone = match.group()
                 break
-        
+
         # Extract email
-        email_match = re.search(r'[\w\.-]+@[\w\.-]+\.\w+', text)
+        email_match = _EMAIL_RE.search(text)
         if email_match:
             entities.email = email_match.group()
-        
+
         # Extract name (simple pattern)
-        name_patterns = [
-            r'лід[ау]?[.,]?\s*([А-Яа-яёЇїІіЄєA-Za-z]+(?:\s+[А-Яа-яёЇїІіЄєA-Za-z]+)?)',
-            r'додай\s+(?:нового\s+)?ліда[.,]?\s*([А-Яа-яёЇїІіЄєA-Za-z]+(?:\s+[А-Яа-яёЇїІіЄєA-Za-z]+)?)',
-        ]
-        for pattern in name_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 name = match.group(1).strip()
                 if len(name) > 2 and not any(kw in name.lower() for kw in ['додай', 'ліда', 'номер']):
                     entities.lead_name = name
                     break
         
-        # Extract source
-        if "сканер" in text_lower or "scanner" in text_lower:
-            entities.source = "SCANNER"
-        elif "партнер" in text_lower or "partner" in text_lower:
-            entities.source = "PARTNER"
-        
-        # Extract domain
-        if "перший" in text_lower or "first" in text_lower:
-            entities.domain = "FIRST"
-        elif "другий" in text_lower or "second" in text_lower:
-            entities.domain = "SECOND"
-        elif "третій" in text_lower or "third" in text_lower:
-            entities.domain = "THIRD"
-        
+        # Source/domain/verb slots resolved in one tagged scan
+        tags = pt.tags
+        entities.source = tags["source"]
+        entities.domain = tags["domain"]
+
         # Extract search query
-        search_verbs = ["знайди", "шукай", "search", "find"]
-        for verb in search_verbs:
-            if verb in text_lower:
-                query = text_lower.replace(verb, "", 1).strip()
-                if query:
-                    entities.search_query = query
-                    break
-        
+        if tags["search_verb"]:
+            query = text_lower.replace(tags["search_verb"], "", 1).strip()
+            if query:
+                entities.search_query = query
+
         # Note content - everything after action verbs
-        note_verbs = ["додай нотатку", "запиши", "нотатка"]
-        for verb in note_verbs:
-            if verb in text_lower:
-                idx = text_lower.find(verb) + len(verb)
-                content = text[idx:].strip()
-                if content:
-                    entities.note_content = content
-                break
-        
+        if tags["note_verb"]:
+            idx = text_lower.find(tags["note_verb"]) + len(tags["note_verb"])
+            content = text[idx:].strip()
+            if content:
+                entities.note_content = content
+
         return entities
 
 
+# Flattened matcher tables, built once at import
+(
+    IntentDetector._LITERAL_TAGS,
+    IntentDetector._PREFIX_CLOSURE,
+    IntentDetector._SCAN_RE,
+) = IntentDetector._build_matcher()
+
+# First characters of every literal detect() can react to (intents plus the
+# confirm/cancel vocabulary) — the prefilter set in detect().
+IntentDetector._TRIGGER_CHARS = frozenset(lit[0] for lit in IntentDetector._LITERAL_TAGS) | frozenset(
+    w[0] for w in CONFIRM_WORDS | CANCEL_WORDS
+)
+
+
+# ─────────────────────────────────────────────────────────────
+# Context store backends
+# ─────────────────────────────────────────────────────────────
+
+class RedisContextStore:
+    """
+    Durable backend for user contexts (enabled via VOICE_AI_CONTEXT_STORE=redis).
+
+    Only the durable slots survive a restart: last lead, last action.
+    Conversation history and pending confirmations are ephemeral by design —
+    a confirmation should not outlive the process that asked for it.
+
+    The in-process OrderedDict stays in front as a write-through LRU, so a
+    warm context never waits on Redis; the store is read once per cold
+    context and written once per turn, best-effort.
+    """
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis.asyncio as redis
+        self._redis = redis.from_url(url, encoding="utf-8", decode_responses=True)
+        self._ttl = ttl_seconds
+
+    async def load(self, user_id: int) -> Optional[dict]:
+        try:
+            payload = await self._redis.get(f"voice_ai:ctx:{user_id}")
+            return _json_loads(payload) if payload else None
+        except Exception as e:
+            logger.warning(f"Context store read failed: {e}")
+            return None
+
+    async def save(self, user_id: int, ctx: "UserContext") -> None:
+        try:
+            await self._redis.setex(
+                f"voice_ai:ctx:{user_id}",
+                self._ttl,
+                _json_dumps({
+                    "last_lead_id": ctx.last_lead_id,
+                    "last_lead_name": ctx.last_lead_name,
+                    "last_action": ctx.last_action,
+                }),
+            )
+        except Exception as e:
+            logger.warning(f"Context store write failed: {e}")
+
+
 # ─────────────────────────────────────────────────────────────
 # VoiceAI Manager
 # ─────────────────────────────────────────────────────────────
 
+# Fallback micro-batching: concurrent AI-fallback queries arriving within
+# one short window are merged into a single OpenAI request. Bursty traffic
+# (morning stand-up, campaign pings) then pays one round-trip and one
+# system-prompt prefill instead of N.
+_FALLBACK_BATCH_WINDOW_SECONDS = 0.05
+_FALLBACK_BATCH_MAX_QUERIES = 8
+
+# The lead summary fed to the fallback prompt is pure display context —
+# a minute of staleness is fine, so it is cached briefly per user.
+_LEADS_CACHE_TTL_SECONDS = 30.0
+
+_FALLBACK_SYSTEM_PROMPT = """Ти — CRM-асистент. Відповідай українською мовою.
+Доступні дані: id, full_name, stage.
+Відповідай коротко, максимум 2 речення."""
+
+_FALLBACK_BATCH_SYSTEM_PROMPT = _FALLBACK_SYSTEM_PROMPT + """
+Нижче кілька незалежних запитів, пронумерованих 'Запит N:'.
+Поверни лише JSON-масив рядків — по одній відповіді на кожен запит, у тому самому порядку."""
+
+
 class VoiceAIManager:
     """
     🎯 Unified VoiceAI Manager
@@ -323,15 +593,71 @@ class VoiceAIManager:
     """
     
     _whisper_model = None
-    
+    _whisper_pipeline = None
+
+    # (expires_at, summary text); the summary is built from the newest
+    # leads regardless of user, so one global entry suffices — a per-user
+    # dict would just duplicate the same text and never evict expired
+    # keys. Class-level so repositories can invalidate it without holding
+    # a manager instance.
+    _leads_cache: Optional[tuple[float, str]] = None
+
     def __init__(self):
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
         self.huggingface_token = os.getenv("HUGGINGFACE_TOKEN")
         self.local_whisper_model = os.getenv("LOCAL_WHISPER_MODEL", "base")
         self.context_ttl_minutes = int(os.getenv("VOICE_AI_CONTEXT_TTL_MINUTES", "120"))
         
-        # User contexts - in production, use Redis/DB
-        self._user_contexts: dict[int, UserContext] = {}
+        # User contexts — in-process LRU, kept in last-seen order
+        # (move_to_end on access) so TTL eviction pops from the front
+        # instead of scanning every context per turn.
+        self._user_contexts: OrderedDict[int, UserContext] = OrderedDict()
+
+        # DB session factory, injected at app startup. When present,
+        # _fetch_leads queries the repository in-process instead of making
+        # an HTTP round-trip to our own API.
+        self._session_factory = None
+
+        # Optional durable backend: lets contexts survive restarts and be
+        # shared across workers without sticky sessions.
+        self._context_store: Optional[RedisContextStore] = None
+        if os.getenv("VOICE_AI_CONTEXT_STORE", "memory") == "redis":
+            self._context_store = RedisContextStore(
+                os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+                self.context_ttl_minutes * 60,
+            )
+
+        # One pooled client for all outbound API calls: reusing connections
+        # skips a TLS+TCP handshake per voice message. (http2 would need the
+        # optional h2 extra, which this project doesn't ship.)
+        self._http = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=8),
+        )
+
+        # Fallback-query micro-batch: (text, user_id, future) tuples waiting
+        # for the next window flush. See _ai_fallback.
+        self._fallback_queue: list[tuple[str, int, asyncio.Future]] = []
+        self._fallback_timer: Optional[asyncio.Task] = None
+
+    def set_session_factory(self, factory) -> None:
+        """Inject the async session factory (call once at app startup)."""
+        self._session_factory = factory
+
+    @classmethod
+    def invalidate_leads_cache(cls, user_id: Optional[int] = None) -> None:
+        """Drop the cached lead summary.
+
+        Called from LeadRepository after lead mutations so the next voice
+        query sees fresh data instead of waiting out the TTL. The
+        ``user_id`` argument is kept for call-site compatibility; the
+        summary is global, so any mutation drops it.
+        """
+        cls._leads_cache = None
+
+    async def aclose(self):
+        """Release pooled HTTP connections on shutdown."""
+        await self._http.aclose()
 
     def assess_transcription_quality(self, text: str) -> dict:
         """Heuristic quality estimation for transcribed voice text."""
@@ -347,7 +673,7 @@ class VoiceAIManager:
         score = 1.0
         hints: list[str] = []
 
-        words = re.findall(r"\w+", raw, flags=re.UNICODE)
+        words = _WORD_RE.findall(raw)
         word_count = len(words)
         if len(raw) < 6:
             score -= 0.4
@@ -356,13 +682,13 @@ class VoiceAIManager:
             score -= 0.25
             hints.append("Сформулюйте команду повним реченням")
 
-        weird_chars = re.findall(r"[^\w\s\#\+\-\.@,:;!?іїєґІЇЄҐа-яА-Яa-zA-Z0-9]", raw)
+        weird_chars = _WEIRD_RE.findall(raw)
         weird_ratio = (len(weird_chars) / max(len(raw), 1))
         if weird_ratio > 0.2:
             score -= 0.2
             hints.append("Багато шуму в тексті — перевірте мікрофон")
 
-        if re.search(r"(.)\1{4,}", raw):
+        if _REPEAT_RE.search(raw):
             score -= 0.15
             hints.append("Ймовірна помилка розпізнавання — повторіть команду")
 
@@ -388,19 +714,29 @@ class VoiceAIManager:
     def get_context(self, user_id: int) -> UserContext:
         """Get or create user context."""
         self._cleanup_contexts()
-        if user_id not in self._user_contexts:
-            self._user_contexts[user_id] = UserContext(user_id=user_id)
-        self._user_contexts[user_id].last_seen_at = datetime.now()
-        return self._user_contexts[user_id]
+        ctx = self._user_contexts.get(user_id)
+        if ctx is None:
+            ctx = UserContext(user_id=user_id)
+            self._user_contexts[user_id] = ctx
+        else:
+            self._user_contexts.move_to_end(user_id)
+        ctx.last_seen_at = time.monotonic()
+        return ctx
 
     def _cleanup_contexts(self):
-        """Drop stale user contexts to avoid memory leaks and stale follow-ups."""
+        """Drop stale user contexts to avoid memory leaks and stale follow-ups.
+
+        Contexts are ordered oldest-seen first, so eviction pops from the
+        front and stops at the first fresh entry — amortized O(1) per turn.
+        """
         if not self._user_contexts:
             return
-        cutoff = datetime.now() - timedelta(minutes=self.context_ttl_minutes)
-        stale_ids = [uid for uid, ctx in self._user_contexts.items() if ctx.last_seen_at < cutoff]
-        for uid in stale_ids:
-            self._user_contexts.pop(uid, None)
+        cutoff = time.monotonic() - self.context_ttl_minutes * 60
+        while self._user_contexts:
+            _, ctx = next(iter(self._user_contexts.items()))
+            if ctx.last_seen_at >= cutoff:
+                break
+            self._user_contexts.popitem(last=False)
     
     def update_context_lead(self, user_id: int, lead_id: int, lead_name: str = None):
         """Update last lead in context."""
@@ -421,19 +757,18 @@ class VoiceAIManager:
         ctx.confirmation_pending = None
         ctx.state = "idle"
 
-    def resolve_pronoun(self, text: str, user_id: int) -> tuple[str, Optional[int], Optional[str]]:
+    def resolve_pronoun(self, text: "str | ProcessedText", user_id: int) -> tuple[str, Optional[int], Optional[str]]:
         """Resolve references like 'його' / 'того ліда' using user context."""
         ctx = self.get_context(user_id)
-        text_lower = text.lower()
+        if ctx.last_lead_id is None and not isinstance(text, ProcessedText):
+            # No antecedent to resolve — skip tokenizing/tagging entirely
+            return text, None, None
+        pt = ProcessedText.of(text)
 
-        pronoun_patterns = [
-            "того ліда", "того", "його", "йому", "нього", "неї", "останнього", "останньому",
-            "that lead", "that one", "the previous", "him",
-        ]
-        if any(p in text_lower for p in pronoun_patterns) and ctx.last_lead_id:
-            return text, ctx.last_lead_id, ctx.last_lead_name
+        if ctx.last_lead_id and pt.tags["pronoun"]:
+            return pt.raw, ctx.last_lead_id, ctx.last_lead_name
 
-        return text, None, None
+        return pt.raw, None, None
     
     # ─────────────────────────────────────────────────────────
     # Voice Processing
@@ -489,28 +824,34 @@ class VoiceAIManager:
         """Local faster-whisper transcription."""
         try:
             if not VoiceAIManager._whisper_model:
+                # int8 weights + an explicit thread count keep CTranslate2 on
+                # its quantized SIMD kernels without oversubscribing the host.
                 VoiceAIManager._whisper_model = WhisperModel(
-                    self.local_whisper_model, device="cpu", compute_type="int8"
+                    self.local_whisper_model, device="cpu", compute_type="int8",
+                    cpu_threads=int(os.getenv("WHISPER_CPU_THREADS", str(os.cpu_count() or 4))),
+                    num_workers=1,
                 )
-            
-            import tempfile
-            loop = asyncio.get_event_loop()
-            
-            def transcribe():
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".ogg") as tmp:
-                    tmp.write(voice_content)
-                    tmp_path = tmp.name
-                
-                try:
-                    segments, _ = VoiceAIManager._whisper_model.transcribe(
-                        tmp_path, beam_size=5, vad_filter=True,
-                        vad_parameters=dict(min_silence_duration_ms=500)
+                # The batched pipeline runs the VAD chunks of one utterance as
+                # a single GEMM batch, so even lone requests decode faster.
+                if BatchedInferencePipeline is not None:
+                    VoiceAIManager._whisper_pipeline = BatchedInferencePipeline(
+                        model=VoiceAIManager._whisper_model
                     )
-                    return " ".join(s.text.strip() for s in segments)
-                finally:
-                    os.unlink(tmp_path)
-            
-            return await loop.run_in_executor(None, transcribe)
+
+            def transcribe():
+                # faster-whisper accepts file-like input: decode straight
+                # from memory instead of a tempfile write/read/unlink cycle.
+                # condition_on_previous_text is off: voice commands are short
+                # single utterances, so the extra context pass buys nothing.
+                engine = VoiceAIManager._whisper_pipeline or VoiceAIManager._whisper_model
+                segments, _ = engine.transcribe(
+                    io.BytesIO(voice_content), beam_size=5, vad_filter=True,
+                    condition_on_previous_text=False,
+                    vad_parameters=dict(min_silence_duration_ms=500)
+                )
+                return " ".join(s.text.strip() for s in segments)
+
+            return await asyncio.to_thread(transcribe)
         except Exception as e:
             logger.warning(f"Local transcription failed: {e}")
             return None
@@ -518,15 +859,14 @@ class VoiceAIManager:
     async def _transcribe_huggingface(self, voice_content: bytes) -> Optional[str]:
         """HuggingFace API transcription."""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api-inference.huggingface.co/models/openai/whisper-base",
-                    headers={"Authorization": f"Bearer {self.huggingface_token}"},
-                    files={"file": ("voice.ogg", voice_content, "audio/ogg")},
-                    data={"model": "openai/whisper-base"},
-                    timeout=30.0
-                )
-            
+            response = await self._http.post(
+                "https://api-inference.huggingface.co/models/openai/whisper-base",
+                headers={"Authorization": f"Bearer {self.huggingface_token}"},
+                files={"file": ("voice.ogg", voice_content, "audio/ogg")},
+                data={"model": "openai/whisper-base"},
+                timeout=30.0
+            )
+
             if response.status_code == 200:
                 return response.json().get("text", "").strip()
         except Exception as e:
@@ -539,15 +879,14 @@ class VoiceAIManager:
             return None
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/audio/transcriptions",
-                    headers={"Authorization": f"Bearer {self.openai_api_key}"},
-                    files={"file": ("voice.ogg", voice_content, "audio/ogg")},
-                    data={"model": "whisper-1"},
-                    timeout=30.0
-                )
-            
+            response = await self._http.post(
+                "https://api.openai.com/v1/audio/transcriptions",
+                headers={"Authorization": f"Bearer {self.openai_api_key}"},
+                files={"file": ("voice.ogg", voice_content, "audio/ogg")},
+                data={"model": "whisper-1"},
+                timeout=30.0
+            )
+
             if response.status_code == 200:
                 return response.json().get("text", "").strip()
         except Exception as e:
@@ -565,19 +904,37 @@ class VoiceAIManager:
         Returns:
             dict with keys: success, text, action, response, needs_confirmation
         """
+        # Single context fetch per turn: the helpers below take the fetched
+        # context instead of re-running get_context (and its cleanup sweep).
+        is_cold = user_id not in self._user_contexts
         context = self.get_context(user_id)
-        resolved_text, resolved_lead_id, _ = self.resolve_pronoun(text, user_id)
-        
+        if is_cold and self._context_store:
+            stored = await self._context_store.load(user_id)
+            if stored:
+                context.last_lead_id = stored.get("last_lead_id")
+                context.last_lead_name = stored.get("last_lead_name")
+                context.last_action = stored.get("last_action")
+        try:
+            return await self._process_text_turn(text, context)
+        finally:
+            if self._context_store:
+                await self._context_store.save(user_id, context)
+
+    async def _process_text_turn(self, text: str, context: UserContext) -> dict:
+        """One conversational turn against an already-hydrated context."""
+        pt = ProcessedText.of(text)
+        resolved_lead_id = context.last_lead_id if pt.tags["pronoun"] else None
+
         # Handle confirmation state
         if context.state == "awaiting_confirmation" and context.confirmation_pending:
-            text_lower = text.lower()
-            if any(w in text_lower for w in ["так", "yes", "підтверджую", "confirm", "ок"]):
+            if CONFIRM_WORDS.intersection(pt.words):
                 # Execute confirmed action
                 return await self._execute_action(
-                    context.confirmation_pending, user_id, confirmed=True
+                    context.confirmation_pending, context, confirmed=True
                 )
-            elif any(w in text_lower for w in ["ні", "no", "скасуй", "cancel"]):
-                self.clear_confirmation(user_id)
+            elif CANCEL_WORDS.intersection(pt.words):
+                context.confirmation_pending = None
+                context.state = "idle"
                 return {
                     "success": True,
                     "text": text,
@@ -587,23 +944,24 @@ class VoiceAIManager:
                 }
         
         # Detect intent
-        action = IntentDetector.detect(resolved_text, context)
+        action = IntentDetector.detect(pt, context)
 
         if resolved_lead_id and not action.entities.lead_id:
             action.entities.lead_id = resolved_lead_id
         
         # Update context
         if action.entities.lead_id:
-            self.update_context_lead(user_id, action.entities.lead_id)
-        
+            context.last_lead_id = action.entities.lead_id
+
         # Determine if confirmation needed
         needs_confirmation = self._needs_confirmation(action)
         if needs_confirmation:
-            self.set_confirmation(user_id, action)
-            return await self._build_confirmation_message(action, user_id)
-        
+            context.confirmation_pending = action
+            context.state = "awaiting_confirmation"
+            return await self._build_confirmation_message(action)
+
         # Execute action directly
-        return await self._execute_action(action, user_id, confirmed=False)
+        return await self._execute_action(action, context, confirmed=False)
     
     def _needs_confirmation(self, action: Action) -> bool:
         """Check if action requires confirmation."""
@@ -615,32 +973,21 @@ class VoiceAIManager:
         
         return False
     
-    async def _build_confirmation_message(self, action: Action, user_id: int) -> dict:
+    async def _build_confirmation_message(self, action: Action) -> dict:
         """Build confirmation message for action."""
         entities = action.entities
-        
+
         if action.intent == Intent.CREATE_LEAD:
-            response = (
-                "📋 <b>ПІДТВЕРДЖЕННЯ</b>\n\n"
-                f"Створити ліда?\n\n"
-                f"👤 <b>Ім'я:</b> {entities.lead_name or '—'}\n"
-                f"📞 <b>Телефон:</b> {entities.phone or '—'}\n"
-                f"📧 <b>Email:</b> {entities.email or '—'}\n"
-                f"📡 <b>Джерело:</b> {entities.source or 'MANUAL'}\n\n"
-                "<i>Напишіть 'так' для підтвердження або 'ні' для скасування.</i>"
-            )
+            response = _CONFIRM_CREATE_TPL.format_map({
+                "lead_name": entities.lead_name or "—",
+                "phone": entities.phone or "—",
+                "email": entities.email or "—",
+                "source": entities.source or "MANUAL",
+            })
         elif action.intent == Intent.DELETE_LEAD:
-            response = (
-                f"⚠️ <b>ВИДАЛЕННЯ ЛІДА #{entities.lead_id}</b>\n\n"
-                "Цю дію неможливо відновити!\n\n"
-                "<i>Напишіть 'так' для підтвердження або 'ні' для скасування.</i>"
-            )
+            response = _CONFIRM_DELETE_TPL.format_map({"lead_id": entities.lead_id})
         elif action.intent == Intent.EDIT_LEAD:
-            response = (
-                f"✏️ <b>ПІДТВЕРДЖЕННЯ ОНОВЛЕННЯ</b>\n\n"
-                f"Оновити ліда #{entities.lead_id or '—'}?\n\n"
-                "<i>Напишіть 'так' для підтвердження або 'ні' для скасування.</i>"
-            )
+            response = _CONFIRM_EDIT_TPL.format_map({"lead_id": entities.lead_id or "—"})
         else:
             response = "Підтвердіть вашу дію: так/ні"
         
@@ -652,31 +999,30 @@ class VoiceAIManager:
             "needs_confirmation": True
         }
     
-    async def _execute_action(self, action: Action, user_id: int, confirmed: bool) -> dict:
+    async def _execute_action(self, action: Action, context: UserContext, confirmed: bool) -> dict:
         """Execute the action and build response."""
-        context = self.get_context(user_id)
-        
         # Clear confirmation state after execution
         if confirmed:
-            self.clear_confirmation(user_id)
-        
+            context.confirmation_pending = None
+            context.state = "idle"
+
         # For unknown intent, use AI fallback
         if action.intent == Intent.UNKNOWN:
-            return await self._ai_fallback(action.original_text, user_id)
-        
+            return await self._ai_fallback(action.original_text, context.user_id)
+
         # Build response based on intent
-        response = await self._build_action_response(action, user_id, confirmed)
-        
+        response = await self._build_action_response(action, context, confirmed)
+
         # Update context
         if action.entities.lead_id:
-            self.update_context_lead(user_id, action.entities.lead_id)
+            context.last_lead_id = action.entities.lead_id
         
         # Add to history
         turn = ConversationTurn(
             timestamp=datetime.now(),
             user_input=action.original_text,
             action=action,
-            bot_response=response.get("text", "")
+            bot_response=response.text
         )
         context.add_turn(turn)
         
@@ -684,94 +1030,95 @@ class VoiceAIManager:
             "success": True,
             "text": action.original_text,
             "action": action,
-            "response": response.get("text", ""),
-            "response_type": response.get("type", "text"),
-            "keyboard": response.get("keyboard"),
-            "followup_hint": response.get("followup_hint"),
-            "suggestions": response.get("suggestions", []),
+            "response": response.text,
+            "response_type": response.type,
+            "keyboard": response.keyboard,
+            "followup_hint": response.followup_hint,
+            "suggestions": list(response.suggestions),
             "needs_confirmation": False
         }
     
-    async def _build_action_response(self, action: Action, user_id: int, confirmed: bool) -> dict:
+    async def _build_action_response(self, action: Action, context: UserContext, confirmed: bool) -> _ActionResponse:
         """Build response message for specific action."""
-        context = self.get_context(user_id)
-        
         if action.intent == Intent.CREATE_LEAD:
             if confirmed:
                 # Would call API to create lead
-                return {
-                    "type": "lead_created",
-                    "text": f"✅ <b>Лід створений!</b>\n\n"
-                            f"Ім'я: {action.entities.lead_name or '—'}\n"
-                            f"Телефон: {action.entities.phone or '—'}"
-                }
+                return _ActionResponse(
+                    type="lead_created",
+                    text=f"✅ <b>Лід створений!</b>\n\n"
+                         f"Ім'я: {action.entities.lead_name or '—'}\n"
+                         f"Телефон: {action.entities.phone or '—'}",
+                )
             else:
-                return {
-                    "type": "confirmation_needed",
-                    "text": "Підтвердіть створення ліда: так/ні"
-                }
+                return _ActionResponse(
+                    type="confirmation_needed",
+                    text="Підтвердіть створення ліда: так/ні",
+                )
         
         elif action.intent == Intent.LIST_LEADS:
-            return {
-                "type": "leads_list",
-                "text": "📋 <b>Ваші ліди:</b>\n\nПоказую список...",
-                "suggestions": ["покажи нотатки", "знайди гарячі", "статистика"]
-            }
+            return _ActionResponse(
+                type="leads_list",
+                text="📋 <b>Ваші ліди:</b>\n\nПоказую список...",
+                suggestions=("покажи нотатки", "знайди гарячі", "статистика"),
+            )
         
         elif action.intent == Intent.STATS:
-            return {
-                "type": "stats",
-                "text": "📊 <b>Статистика:</b>\n\nЗавантажую...",
-                "suggestions": ["гарячі ліди", "продажі", "знайди кваліфіковані"]
-            }
+            return _ActionResponse(
+                type="stats",
+                text="📊 <b>Статистика:</b>\n\nЗавантажую...",
+                suggestions=("гарячі ліди", "продажі", "знайди кваліфіковані"),
+            )
         
         elif action.intent == Intent.ANALYZE_LEAD:
             lead_id = action.entities.lead_id or context.last_lead_id
             if lead_id:
-                return {
-                    "type": "analysis",
-                    "text": f"🤖 <b>Аналіз ліда #{lead_id}</b>\n\nЗавантажую...",
-                    "followup_hint": "Після аналізу можу запропонувати наступний крок: nurture або transfer."
-                }
-            return {"type": "error", "text": "Вкажіть ID ліда для аналізу."}
+                return _ActionResponse(
+                    type="analysis",
+                    text=f"🤖 <b>Аналіз ліда #{lead_id}</b>\n\nЗавантажую...",
+                    followup_hint="Після аналізу можу запропонувати наступний крок: nurture або transfer.",
+                )
+            return _ActionResponse(type="error", text="Вкажіть ID ліда для аналізу.")
         
         elif action.intent == Intent.SEARCH:
             query = action.entities.search_query
-            return {
-                "type": "search_results",
-                "text": f"🔍 <b>Результати пошуку:</b> {query}\n\nШукаю..."
-            }
+            return _ActionResponse(
+                type="search_results",
+                text=f"🔍 <b>Результати пошуку:</b> {query}\n\nШукаю...",
+            )
         
         elif action.intent == Intent.SHOW_NOTES:
-            return {
-                "type": "notes_list",
-                "text": "📝 <b>Нотатки:</b>\n\nПоказую..."
-            }
+            return _ActionResponse(
+                type="notes_list",
+                text="📝 <b>Нотатки:</b>\n\nПоказую...",
+            )
         
         elif action.intent == Intent.ADD_NOTE:
             lead_id = action.entities.lead_id or context.last_lead_id
             content = action.entities.note_content
             if lead_id and content:
-                return {
-                    "type": "note_added",
-                    "text": f"📝 Нотатка для ліда #{lead_id}:\n{content}"
-                }
-            return {"type": "error", "text": "Вкажіть ліда та текст нотатки."}
+                return _ActionResponse(
+                    type="note_added",
+                    text=f"📝 Нотатка для ліда #{lead_id}:\n{content}",
+                )
+            return _ActionResponse(type="error", text="Вкажіть ліда та текст нотатки.")
         
         elif action.intent == Intent.SALES:
-            return {
-                "type": "sales_pipeline",
-                "text": "💰 <b>Продажі:</b>\n\nПоказую воронку..."
-            }
-        
+            return _ActionResponse(
+                type="sales_pipeline",
+                text="💰 <b>Продажі:</b>\n\nПоказую воронку...",
+            )
+
         # Default
-        return {
-            "type": "text",
-            "text": f"Дію '{action.intent.value}' виконано."
-        }
+        return _ActionResponse(text=f"Дію '{action.intent.value}' виконано.")
     
     async def _ai_fallback(self, text: str, user_id: int) -> dict:
-        """Use AI for complex queries."""
+        """
+        Use AI for complex queries.
+
+        Queries are collected into a short micro-batch window so a burst of
+        concurrent fallbacks shares one completion request; the final dict
+        always carries the full reply.
+        """
         if not self.openai_api_key:
             return {
                 "success": True,
@@ -781,74 +1128,204 @@ class VoiceAIManager:
                 "followup_hint": "Наприклад: 'покажи ліди', 'додай ліда', 'додай нотатку до ліда #12'.",
                 "needs_confirmation": False
             }
-        
-        try:
-            # Fetch leads for context
-            leads_data = await self._fetch_leads(user_id)
-            
-            system_prompt = """Ти — CRM-асистент. Відповідай українською мовою.
-Доступні дані: id, full_name, source, stage, business_domain, ai_score."""
-            
-            user_prompt = f"Запит: {text}\n\nДані лідів:\n{leads_data}"
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers={"Authorization": f"Bearer {self.openai_api_key}"},
-                    json={
-                        "model": "gpt-4o-mini",
-                        "messages": [
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt}
-                        ],
-                        "max_tokens": 300,
-                        "temperature": 0.3
-                    },
-                    timeout=30.0
-                )
-            
-            if response.status_code == 200:
-                ai_response = response.json()["choices"][0]["message"]["content"]
-                return {
-                    "success": True,
-                    "text": text,
-                    "action": Intent.UNKNOWN,
-                    "response": ai_response,
-                    "needs_confirmation": False
-                }
-        except Exception as e:
-            logger.error(f"AI fallback error: {e}")
-        
+
+        # Queue into the current micro-batch window and wait for the
+        # flush to resolve our future.
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._fallback_queue.append((text, user_id, future))
+        if len(self._fallback_queue) >= _FALLBACK_BATCH_MAX_QUERIES:
+            if self._fallback_timer is not None:
+                self._fallback_timer.cancel()
+            # Keep a strong reference: the event loop only holds weak refs
+            # to tasks, so a bare create_task could be GC'd mid-flush and
+            # strand every queued future.
+            self._fallback_timer = asyncio.create_task(self._flush_fallback_batch())
+        elif len(self._fallback_queue) == 1:
+            self._fallback_timer = asyncio.create_task(self._flush_fallback_after_window())
+        reply = await future
+
+        if reply is None:
+            return {
+                "success": True,
+                "text": text,
+                "action": Intent.UNKNOWN,
+                "response": "Не вдалося обробити запит. Спробуйте ще раз.",
+                "needs_confirmation": False
+            }
         return {
             "success": True,
             "text": text,
             "action": Intent.UNKNOWN,
-            "response": "Не вдалося обробити запит. Спробуйте ще раз.",
+            "response": reply,
             "needs_confirmation": False
         }
+
+    async def _flush_fallback_after_window(self) -> None:
+        """Flush the fallback batch once the collection window elapses."""
+        await asyncio.sleep(_FALLBACK_BATCH_WINDOW_SECONDS)
+        self._fallback_timer = None
+        await self._flush_fallback_batch()
+
+    async def _flush_fallback_batch(self) -> None:
+        """Send one OpenAI request for every query queued in this window."""
+        batch, self._fallback_queue = self._fallback_queue, []
+        if not batch:
+            return
+
+        if len(batch) == 1:
+            # No burst — keep the single-query prompt and stream format.
+            text, user_id, future = batch[0]
+            reply = await self._stream_fallback_reply(text, user_id)
+            if not future.done():
+                future.set_result(reply)
+            return
+
+        replies: Optional[list] = None
+        try:
+            leads_data = await self._fetch_leads(batch[0][1])
+            numbered = "\n".join(f"Запит {i}: {text}" for i, (text, _, _) in enumerate(batch, 1))
+            user_prompt = f"Дані лідів:\n{leads_data}\n\n{numbered}"
+            response = await self._http.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.openai_api_key}",
+                    "Content-Type": "application/json",
+                },
+                # content=_json_dumps(...) marshals the body with orjson
+                # (when installed) instead of httpx's stdlib-json path.
+                content=_json_dumps({
+                    "model": "gpt-4o-mini",
+                    "messages": [
+                        {"role": "system", "content": _FALLBACK_BATCH_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "max_tokens": 120 * len(batch),
+                    "temperature": 0.3,
+                }),
+                timeout=30.0
+            )
+            if response.status_code == 200:
+                content = _json_loads(response.content)["choices"][0]["message"]["content"]
+                parsed = _json_loads(content.strip())
+                if isinstance(parsed, list) and len(parsed) == len(batch):
+                    replies = parsed
+        except Exception as e:
+            logger.error(f"AI fallback batch error: {e}")
+
+        for i, (_, _, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(str(replies[i]) if replies is not None else None)
+
+    async def _stream_fallback_reply(self, text: str, user_id: int) -> Optional[str]:
+        """One streamed completion for a single query; None on failure."""
+        try:
+            # Fetch leads for context
+            leads_data = await self._fetch_leads(user_id)
+
+            # Decoding time scales with output length: keep the budget tight
+            # and tell the model to be terse.
+            user_prompt = f"Запит: {text}\n\nДані лідів:\n{leads_data}"
+
+            async with self._http.stream(
+                "POST",
+                "https://api.openai.com/v1/chat/completions",
+                headers={
+                    "Authorization": f"Bearer {self.openai_api_key}",
+                    "Content-Type": "application/json",
+                },
+                content=_json_dumps({
+                    "model": "gpt-4o-mini",
+                    "messages": [
+                        {"role": "system", "content": _FALLBACK_SYSTEM_PROMPT},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    "max_tokens": 120,
+                    "temperature": 0.3,
+                    "stop": ["\n\n"],
+                    "stream": True
+                }),
+                timeout=30.0
+            ) as response:
+                if response.status_code == 200:
+                    parts: list[str] = []
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data: "):
+                            continue
+                        payload = line[6:]
+                        if payload == "[DONE]":
+                            break
+                        delta = _json_loads(payload)["choices"][0]["delta"].get("content")
+                        if delta:
+                            parts.append(delta)
+                    return "".join(parts)
+        except Exception as e:
+            logger.error(f"AI fallback error: {e}")
+        return None
     
     async def _fetch_leads(self, user_id: int) -> str:
-        """Fetch leads as text context for AI."""
+        """Fetch leads as text context for AI.
+
+        Queries the repository directly when a session factory was injected
+        — we run in the same process as the API, so the old loopback HTTP
+        call paid JSON encode/decode, ASGI routing and Pydantic validation
+        for nothing. The HTTP path remains as a fallback for deployments
+        where the bot runs separately.
+        """
+        now = time.monotonic()
+        cached = VoiceAIManager._leads_cache
+        if cached is not None and cached[0] > now:
+            return cached[1]
+
+        # 10 most recent leads are enough context; fewer input
+        # tokens means proportionally less prefill time.
+        if self._session_factory is not None:
+            try:
+                from app.repositories.lead_repo import LeadRepository
+                async with self._session_factory() as db:
+                    leads, _ = await LeadRepository(db).get_all(limit=10)
+                summary = "\n".join(
+                    f"ID:{l.id} | {l.full_name} | {l.stage.value}"
+                    for l in leads
+                )
+                VoiceAIManager._leads_cache = (now + _LEADS_CACHE_TTL_SECONDS, summary)
+                return summary
+            except Exception as e:
+                logger.warning(f"Lead context query failed: {e}")
+                return "Дані недоступні."
+
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    "http://localhost:8000/api/v1/leads",
-                    timeout=10.0
+            # Push the slice into the API's SQL LIMIT instead of downloading
+            # the full lead list and discarding most of it here; the endpoint
+            # already returns newest-first, so one generator pass suffices.
+            resp = await self._http.get(
+                "http://localhost:8000/api/v1/leads",
+                params={"page_size": 10},
+                timeout=10.0
+            )
+            if resp.status_code == 200:
+                summary = "\n".join(
+                    f"ID:{l.get('id')} | {l.get('full_name')} | {l.get('stage')}"
+                    for l in _json_loads(resp.content).get("items", [])
                 )
-                if resp.status_code == 200:
-                    leads = resp.json().get("items", [])[:20]
-                    return "\n".join(
-                        f"ID:{l.get('id')} | {l.get('full_name')} | {l.get('stage')}"
-                        for l in leads
-                    )
+                VoiceAIManager._leads_cache = (now + _LEADS_CACHE_TTL_SECONDS, summary)
+                return summary
         except:
             pass
         return "Дані недоступні."
 
 
-# Import asyncio for executor
-import asyncio
+# Singleton instance, built on first use: importing this module (tests,
+# subprocesses, cold starts) no longer pays for constructing the manager
+# and its pooled HTTP client.
+@lru_cache(maxsize=1)
+def get_voice_ai() -> VoiceAIManager:
+    """Return the process-wide VoiceAIManager, creating it on first call."""
+    return VoiceAIManager()
+
 
-# Singleton instance
-voice_ai = VoiceAIManager()
+def __getattr__(name: str):
+    # Back-compat: `from app.ai.voice_ai_manager import voice_ai` keeps
+    # working, but the instance is only created when actually requested.
+    if name == "voice_ai":
+        return get_voice_ai()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
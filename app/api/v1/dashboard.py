@@ -72,8 +72,8 @@ async def get_dashboard():
         
         # Get all leads and sales (expensive)
         leads, _ = await lead_repo.get_all()
-        sales, _ = await sale_repo.get_all()
-        
+        sales, _ = await sale_repo.get_all(return_total=False)
+
         # Count leads by stage
         lead_counts = {
             "total": len(leads),
@@ -159,8 +159,8 @@ async def get_sales_by_stage():
     
     async with AsyncSessionLocal() as session:
         sale_repo = SaleRepository(session)
-        sales, _ = await sale_repo.get_all()
-        
+        sales, _ = await sale_repo.get_all(return_total=False)
+
         stages = {
             "new": 0,
             "kyc": 0,
@@ -191,8 +191,8 @@ async def get_conversion_funnel():
         sale_repo = SaleRepository(session)
         
         leads, _ = await lead_repo.get_all()
-        sales, _ = await sale_repo.get_all()
-        
+        sales, _ = await sale_repo.get_all(return_total=False)
+
         # Funnel stages
         new_leads = sum(1 for l in leads if l.stage.value == "new")
         contacted = sum(1 for l in leads if l.stage.value in ("new", "contacted"))
@@ -224,7 +224,7 @@ async def get_revenue_by_month():
 
     async with AsyncSessionLocal() as session:
         sale_repo = SaleRepository(session)
-        sales, _ = await sale_repo.get_all(limit=10000)  # unpack tuple
+        sales, _ = await sale_repo.get_all(limit=10000, return_total=False)  # unpack tuple
 
         # Group by month
         monthly = {}
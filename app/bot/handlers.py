@@ -9,6 +9,7 @@ import uuid
 from io import BytesIO
 from typing import Optional
 
+import httpx
 from aiogram import Bot, Dispatcher, Router, F
 from aiogram.filters import Command, CommandStart
 from aiogram.fsm.context import FSMContext
@@ -40,10 +41,39 @@ from app.bot.keyboards import (
     get_back_keyboard,
     get_back_to_menu_keyboard,
     get_retry_keyboard,
-    get_dashboard_keyboard,from app.bot import ui
+    get_dashboard_keyboard,
+    get_sales_category_keyboard,
+    get_sale_stage_categories_keyboard,
+    get_sales_list_keyboard,
+    get_sale_detail_keyboard,
+    get_edit_sale_stage_keyboard,
+    get_name_keyboard,
+    get_email_keyboard,
+    get_phone_keyboard,
+    get_username_keyboard,
+    get_intent_keyboard,
+    get_qualification_keyboard,
+    get_lead_confirm_keyboard,
+    get_note_confirm_keyboard,
+    get_note_view_keyboard,
+    get_notes_manage_keyboard,
+    get_ai_analysis_next_steps_keyboard,
+)
+from app.bot import ui
 from app.bot.keyboards import get_paste_lead_keyboard, get_paste_confirm_keyboard
+from app.bot.states import (
+    LeadCreationState,
+    LeadPasteState,
+    AddNoteState,
+    SearchState,
+    SaleManagementState,
+    AIAssistantState,
+    VoiceChatState,
+    CopilotState,
+)
 from app.core.config import settings
 from app.ai.unified_ai_service import unified_ai as ai_assistant
+from app.ai.voice_ai_manager import CANCEL_WORDS
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +82,12 @@ bot: Optional[Bot] = None
 
 LEADS_PAGE_SIZE = 7  # Leads per page in list view
 
+# Cancel triggers: UI button labels plus the shared voice-AI cancel
+# vocabulary (both lower- and capitalized forms for typed messages).
+CANCEL_TEXTS = ["❌ Скасувати", "Скасувати"] + sorted(
+    {form for w in CANCEL_WORDS for form in (w, w.capitalize())}
+)
+
 NOTE_TYPE_EMOJIS = {
     "general": "📋",
     "contact": "📞",
@@ -100,6 +136,236 @@ def _sanitize_telegram_html(text: str) -> str:
     text = re.sub(r"<\s*br\s*/?\s*>", "\n", text, flags=re.IGNORECASE)
     return text
 
+
+# ─────────────────────────────────────────────────────────────
+# Bot Instance + API Helpers
+# ─────────────────────────────────────────────────────────────
+
+def get_bot() -> Bot:
+    """Return the active Bot instance (polling or webhook mode)."""
+    global bot
+    if bot is None:
+        from app.bot.webhook import init_webhook_bot
+        bot = init_webhook_bot()
+    return bot
+
+
+def _api_headers(user_id: int = None) -> dict:
+    """Auth headers for internal API calls (static bot token)."""
+    headers = {"Authorization": f"Bearer {settings.API_SECRET_TOKEN}"}
+    if user_id is not None:
+        headers["X-Telegram-Id"] = str(user_id)
+    return headers
+
+
+async def _api_request(method: str, path: str, payload: dict = None,
+                       user_id: int = None, params: dict = None) -> Optional[dict]:
+    """Perform an HTTP call against the internal API.
+
+    Returns the parsed JSON body on success, a dict with an "error" key on
+    HTTP/network failure — callers check `if res and "error" not in res`.
+    """
+    url = f"{bot_settings.API_BASE_URL}{path}"
+    try:
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            response = await client.request(
+                method, url, json=payload, params=params, headers=_api_headers(user_id)
+            )
+        if response.status_code == 204:
+            return {}
+        body = response.json() if response.content else {}
+        if response.status_code >= 400:
+            detail = body.get("detail") or body.get("message") if isinstance(body, dict) else None
+            logger.warning(f"API {method} {path} failed: {response.status_code} {detail}")
+            return {"error": str(detail or f"HTTP {response.status_code}")}
+        return body
+    except Exception as e:
+        logger.error(f"API {method} {path} error: {e}")
+        return {"error": str(e)}
+
+
+async def _api_get(path: str, user_id: int = None, params: dict = None) -> Optional[dict]:
+    return await _api_request("GET", path, user_id=user_id, params=params)
+
+
+async def _api_post(path: str, payload: dict, user_id: int = None) -> Optional[dict]:
+    return await _api_request("POST", path, payload=payload, user_id=user_id)
+
+
+async def _api_patch(path: str, payload: dict, user_id: int = None) -> Optional[dict]:
+    return await _api_request("PATCH", path, payload=payload, user_id=user_id)
+
+
+async def _api_delete(path: str, user_id: int = None) -> Optional[dict]:
+    return await _api_request("DELETE", path, user_id=user_id)
+
+
+def _api_error_text(result, default: str = "Невідома помилка") -> str:
+    """Extract a human-readable error message from an API helper result."""
+    if isinstance(result, dict):
+        err = result.get("error")
+        if isinstance(err, str) and err:
+            return err
+    return default
+
+
+async def get_leads_via_api(user_id: int, query: str = None, stage: str = None,
+                            source: str = None, domain: str = None) -> list:
+    """Fetch leads from the API with optional filters. Returns [] on failure."""
+    params = {"page_size": 200}
+    if stage:
+        params["stage"] = stage
+    if source:
+        params["source"] = source
+    if domain:
+        params["business_domain"] = domain
+    res = await _api_get("/api/v1/leads", user_id=user_id, params=params)
+    if not res or "error" in res:
+        return []
+    leads = res.get("items", [])
+    if query:
+        q = query.lower()
+        leads = [
+            l for l in leads
+            if q in (l.get("full_name") or "").lower()
+            or q in (l.get("email") or "").lower()
+            or q in (l.get("phone") or "")
+        ]
+    return leads
+
+
+async def get_lead_by_id_via_api(lead_id: int, user_id: int = None) -> Optional[dict]:
+    """Fetch a single lead. Returns an "error" dict when not found."""
+    return await _api_get(f"/api/v1/leads/{lead_id}", user_id=user_id)
+
+
+async def update_lead_via_api(lead_id: int, payload: dict, user_id: int = None) -> Optional[dict]:
+    """Patch arbitrary lead fields (source, domain, etc.)."""
+    res = await _api_patch(f"/api/v1/leads/{lead_id}", payload, user_id=user_id)
+    return res if res and "error" not in res else None
+
+
+async def update_lead_stage_via_api(lead_id: int, stage: str, user_id: int = None) -> Optional[dict]:
+    """Move a lead to a new stage via the dedicated stage endpoint."""
+    return await _api_patch(f"/api/v1/leads/{lead_id}/stage", {"stage": stage}, user_id=user_id)
+
+
+async def delete_lead_via_api(lead_id: int, user_id: int = None) -> bool:
+    """Delete a lead via the API. Returns True on success."""
+    res = await _api_delete(f"/api/v1/leads/{lead_id}", user_id=user_id)
+    return res is not None and "error" not in res
+
+
+async def get_dashboard_via_api(user_id: int = None) -> Optional[dict]:
+    """Fetch aggregated dashboard stats."""
+    return await _api_get("/api/v1/dashboard", user_id=user_id)
+
+
+async def _upload_file_to_api(lead_id: int, file_id: str, filename: str, user_id: int) -> bool:
+    """Download a Telegram file and re-upload it as a lead attachment."""
+    try:
+        bot_instance = get_bot()
+        file = await bot_instance.get_file(file_id)
+        content = await bot_instance.download_file(file.file_path)
+        data = content.read() if hasattr(content, "read") else content
+
+        url = f"{bot_settings.API_BASE_URL}/api/v1/leads/{lead_id}/attachments"
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.post(
+                url, files={"file": (filename, data)}, headers=_api_headers(user_id)
+            )
+        return response.status_code < 400
+    except Exception as e:
+        logger.error(f"Attachment upload failed for lead {lead_id}: {e}")
+        return False
+
+
+async def safe_edit(callback: CallbackQuery, text: str, keyboard: InlineKeyboardMarkup = None):
+    """Edit the callback message, tolerating 'message is not modified' errors."""
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
+    except Exception as e:
+        if "message is not modified" in str(e).lower():
+            return
+        try:
+            await callback.message.answer(text, reply_markup=keyboard, parse_mode="HTML")
+        except Exception:
+            logger.warning(f"safe_edit failed: {e}")
+
+
+async def show_leads_list_page(callback: CallbackQuery, leads: list, title: str, page: int = 0):
+    """Render one page of a leads list with pagination keyboard."""
+    if not leads:
+        await safe_edit(callback, f"{title}\n\n<i>Нічого не знайдено.</i>", get_back_to_menu_keyboard())
+        return
+    total_pages = max(1, (len(leads) + LEADS_PAGE_SIZE - 1) // LEADS_PAGE_SIZE)
+    page = max(0, min(page, total_pages - 1))
+    chunk = leads[page * LEADS_PAGE_SIZE:(page + 1) * LEADS_PAGE_SIZE]
+    header = ui.format_leads_list(chunk, title, page, total_pages)
+    await safe_edit(callback, header, get_lead_list_keyboard(chunk, page, total_pages))
+
+
+async def show_lead_detail(callback: CallbackQuery, lead_id: int):
+    """Render the lead card with the full action keyboard."""
+    lead = await get_lead_by_id_via_api(lead_id, user_id=callback.from_user.id)
+    if not lead or "error" in lead:
+        await safe_edit(
+            callback,
+            ui.format_error(f"Lead #{lead_id} not found.", "It may have been deleted."),
+            get_back_to_menu_keyboard()
+        )
+        return
+    await safe_edit(callback, ui.format_lead_card(lead), get_lead_detail_keyboard(lead_id, lead.get("stage")))
+
+
+_EMAIL_VALID_RE = re.compile(r"^[\w\.\+\-]+@[\w\-]+(\.[\w\-]+)+$")
+_PHONE_VALID_RE = re.compile(r"^\+?\d[\d\s\-\(\)]{6,18}$")
+
+
+def is_valid_email(email: str) -> bool:
+    """Basic email format check for the lead creation FSM."""
+    return bool(email and _EMAIL_VALID_RE.match(email.strip()))
+
+
+def is_valid_phone(phone: str) -> bool:
+    """Basic phone format check (digits, optional +, 7-19 chars)."""
+    return bool(phone and _PHONE_VALID_RE.match(phone.strip()))
+
+
+def _build_next_question_for_analysis(lead: Optional[dict]) -> str:
+    """Suggest the next qualification question based on the lead's stage."""
+    if not lead:
+        return "Чи вдалося зв'язатися з клієнтом?"
+    stage = (lead.get("stage") or "").lower()
+    if stage == "new":
+        return "Чи вдалося зв'язатися з клієнтом?"
+    if stage == "contacted":
+        return "Який бюджет та строки обговорили з клієнтом?"
+    if stage == "qualified":
+        return "Чи готовий клієнт до передачі в продажі?"
+    return "Який наступний крок по цьому ліду?"
+
+
+def _copilot_missing_fields_prompt(action: str, missing_fields: list) -> Optional[str]:
+    """Build a clarification prompt when a parsed command lacks required slots."""
+    if not missing_fields:
+        return None
+    if action == "create" and "name_or_phone_or_email" in missing_fields:
+        return (
+            "📝 <b>Потрібно більше даних для створення ліда</b>\n\n"
+            "Вкажіть хоча б ім'я, телефон або email:\n"
+            "• <code>додай ліда Іван +380501234567</code>"
+        )
+    if action in ("note", "analyze") and "lead_id" in missing_fields:
+        return (
+            "ℹ️ <b>Вкажіть ID ліда</b>\n\n"
+            "Наприклад:\n"
+            "• <code>додай нотатку до ліда #12: передзвонити завтра</code>\n"
+            "• <code>проаналізуй ліда #12</code>"
+        )
+    return None
+
+
 # ─────────────────────────────────────────────────────────────
 # Command Handlers
 # ─────────────────────────────────────────────────────────────
@@ -285,7 +551,8 @@ async def handle_ai_voice_query(message: Message, state: FSMContext):
         await message.answer("🤖 <i>Думаю...</i>", parse_mode="HTML")
 
         leads = await get_leads_via_api(user_id=message.from_user.id)
-        response = _sanitize_telegram_html(await ai_assistant.process_query(query_text, leads))        try:
+        response = _sanitize_telegram_html(await ai_assistant.process_query(query_text, leads))
+        try:
             await message.answer(response, parse_mode="HTML")
         except Exception as send_err:
             logger.warning(f"Failed to send AI voice response with HTML, fallback to plain: {send_err}")
@@ -456,7 +723,7 @@ async def voice_edit_note(callback: CallbackQuery, state: FSMContext):
 
 
 @router.message(Command("cancel"))
-@router.message(F.text.in_(["❌ Скасувати", "Скасувати", "Cancel", "cancel", "Ні", "ні", "no", "No", "відміна", "Відміна"]))
+@router.message(F.text.in_(CANCEL_TEXTS))
 @router.message(F.text == "📋 Menu")
 @router.message(F.text == "Меню")
 async def handle_cancel_voice_mode(message: Message, state: FSMContext):
@@ -480,7 +747,65 @@ async def handle_cancel_voice_mode(message: Message, state: FSMContext):
 
 
 @router.message(F.voice, VoiceChatState.active)
-@router.message(F.voice, CopilotState.active)        
+@router.message(F.voice, CopilotState.active)
+async def handle_voice_message(message: Message, state: FSMContext):
+    """Handle voice commands in active Copilot mode."""
+    bot_instance = get_bot()
+    await message.answer("🎤 <i>Розпізнаю голосове повідомлення...</i>", parse_mode="HTML")
+
+    if ai_assistant is None:
+        await message.answer("⚠️ AI service unavailable right now. Please try again later.", parse_mode="HTML")
+        return
+
+    try:
+        voice = message.voice
+        file = await bot_instance.get_file(voice.file_id)
+        voice_content = await bot_instance.download_file(file.file_path)
+
+        text = await ai_assistant.transcribe_voice(voice_content)
+        if not text:
+            await message.answer(
+                "⚠️ <b>Не вдалося розпізнати голос</b>\n\n"
+                "Спробуйте ще раз або надішліть команду текстом.",
+                parse_mode="HTML"
+            )
+            return
+
+        quality = ai_assistant.assess_transcription_quality(text)
+        badge = _voice_quality_badge(quality.get("score", 0.0))
+
+        await message.answer(
+            f"📝 <b>Розпізнано:</b> {text}\n"
+            f"{badge} <b>Якість:</b> {quality.get('label', 'UNKNOWN')} ({quality.get('score', 0.0):.0%})",
+            parse_mode="HTML"
+        )
+
+        if quality.get("needs_clarification"):
+            hints = quality.get("hints", [])
+            hint_text = "\n".join([f"• {h}" for h in hints]) if hints else "• Скажіть команду чіткіше"
+            await message.answer(
+                "⚠️ <b>Низька якість розпізнавання</b>\n\n"
+                "Щоб уникнути помилкових дій, повторіть голосове повідомлення.\n\n"
+                f"<b>Підказки:</b>\n{hint_text}",
+                parse_mode="HTML"
+            )
+            return
+
+        # Resolve pronouns ("йому", "цьому ліду") against recent context
+        text, resolved_lead_id, _resolved_lead_name = ai_assistant.resolve_pronoun(
+            text, message.from_user.id
+        )
+
+        # Parse command using unified AI
+        parsed = ai_assistant.parse_command(text, user_id=message.from_user.id)
+        action = parsed.get("action")
+        lead_data = parsed.get("lead_data", {})
+        query = parsed.get("query")
+        ui_hint = parsed.get("ui_hint", {})
+        missing_fields = parsed.get("missing_fields", [])
+        if resolved_lead_id and not lead_data.get("lead_id"):
+            lead_data["lead_id"] = resolved_lead_id
+
         # If no action detected, use simple rule-based fallback
         text_lower = text.lower()
         if not action:
@@ -513,8 +838,31 @@ async def handle_cancel_voice_mode(message: Message, state: FSMContext):
         slot_prompt = _copilot_missing_fields_prompt(action, missing_fields)
         if slot_prompt:
             await message.answer(slot_prompt, parse_mode="HTML")
-            return            return
-                
+            return
+
+        if action == "create":
+            lead_payload = {
+                "full_name": lead_data.get("name") or "Невідомий лід",
+                "phone": lead_data.get("phone"),
+                "email": lead_data.get("email"),
+                "source": lead_data.get("source", "MANUAL"),
+            }
+
+            confirm_text = (
+                f"📝 <b>ПІДТВЕРДЖЕННЯ</b>\n\n"
+                f"Створити ліда з цими даними?\n\n"
+                f"👤 <b>Ім'я:</b> {lead_payload['full_name']}\n"
+                f"📞 <b>Телефон:</b> {lead_payload.get('phone') or '—'}\n"
+                f"📧 <b>Email:</b> {lead_payload.get('email') or '—'}\n"
+                f"📡 <b>Джерело:</b> {lead_payload['source']}\n\n"
+                "<i>Виберіть дію:</i>"
+            )
+
+            await state.set_state(VoiceConfirmState.waiting_for_create_confirm)
+            await state.update_data(pending_lead_data=lead_payload)
+            await message.answer(confirm_text, reply_markup=get_voice_confirm_keyboard(data_type="lead"), parse_mode="HTML")
+            return
+
         elif action == "note" and lead_data.get("lead_id"):
             lead_id = lead_data["lead_id"]
             note_content = lead_data.get("content", text)
@@ -676,7 +1024,8 @@ async def handle_cancel_voice_mode(message: Message, state: FSMContext):
         else:
             # Default: try AI assistant as fallback
             leads = await get_leads_via_api(user_id=message.from_user.id)
-            response = _sanitize_telegram_html(await ai_assistant.process_query(text, leads))            await message.answer(response, parse_mode="HTML")
+            response = _sanitize_telegram_html(await ai_assistant.process_query(text, leads))
+            await message.answer(response, parse_mode="HTML")
                 
     except Exception as e:
         logger.error(f"Voice processing error: {e}")
@@ -699,7 +1048,19 @@ async def handle_voice_inactive(message: Message, state: FSMContext):
 
 
 @router.message(VoiceChatState.active)
-@router.message(CopilotState.active)            reply_markup=get_main_menu_keyboard(),
+@router.message(CopilotState.active)
+async def handle_text_message(message: Message, state: FSMContext):
+    """Handle text commands in active Copilot mode."""
+    text = (message.text or "").strip()
+    if not text:
+        return
+
+    if text in CANCEL_TEXTS or text.lower() in CANCEL_WORDS:
+        await state.clear()
+        await message.answer(
+            "👋 <b>Вихід з режиму Copilot</b>\n\n"
+            "Ви вийшли з режиму Copilot. Повертайтесь до меню.",
+            reply_markup=get_main_menu_keyboard(),
             parse_mode="HTML"
         )
         return
@@ -716,8 +1077,66 @@ async def handle_voice_inactive(message: Message, state: FSMContext):
         lead_data = parsed.get("lead_data", {})
         query = parsed.get("query")
         ui_hint = parsed.get("ui_hint", {})
-        missing_fields = parsed.get("missing_fields", [])            return
-                
+        missing_fields = parsed.get("missing_fields", [])
+        resolved_lead_id = lead_data.get("lead_id")
+
+        # If no action detected, use simple rule-based fallback
+        text_lower = text.lower()
+        if not action:
+            if any(kw in text_lower for kw in ["додай ліда", "створи ліда", "new lead", "новийлід"]):
+                action = "create"
+            elif any(kw in text_lower for kw in ["нотатк", "замітк", "note", "записа"]):
+                action = "note"
+                # Try to extract lead ID - first from resolved context
+                if resolved_lead_id:
+                    lead_data["lead_id"] = resolved_lead_id
+                else:
+                    lead_id_match = re.search(r'лід[ау]?\s*#?(\d+)', text_lower)
+                    if lead_id_match:
+                        lead_data["lead_id"] = int(lead_id_match.group(1))
+            elif any(kw in text_lower for kw in ["покажи", "список", "show", "list", "ліди"]):
+                action = "list"
+
+        # Confidence gate + slot filling clarification
+        if ui_hint.get("reason") == "low_confidence" and not action:
+            await message.answer(
+                "🤔 Я не до кінця впевнений, що правильно зрозумів запит.\n\n"
+                "Спробуйте конкретніше:\n"
+                "• <code>додай ліда Іван +380...</code>\n"
+                "• <code>проаналізуй ліда #12</code>\n"
+                "• <code>додай нотатку до ліда #12: ...</code>",
+                parse_mode="HTML"
+            )
+            return
+
+        slot_prompt = _copilot_missing_fields_prompt(action, missing_fields)
+        if slot_prompt:
+            await message.answer(slot_prompt, parse_mode="HTML")
+            return
+
+        if action == "create":
+            lead_payload = {
+                "full_name": lead_data.get("name") or "Невідомий лід",
+                "phone": lead_data.get("phone"),
+                "email": lead_data.get("email"),
+                "source": lead_data.get("source", "MANUAL"),
+            }
+
+            confirm_text = (
+                f"📝 <b>ПІДТВЕРДЖЕННЯ</b>\n\n"
+                f"Створити ліда з цими даними?\n\n"
+                f"👤 <b>Ім'я:</b> {lead_payload['full_name']}\n"
+                f"📞 <b>Телефон:</b> {lead_payload.get('phone') or '—'}\n"
+                f"📧 <b>Email:</b> {lead_payload.get('email') or '—'}\n"
+                f"📡 <b>Джерело:</b> {lead_payload['source']}\n\n"
+                "<i>Виберіть дію:</i>"
+            )
+
+            await state.set_state(VoiceConfirmState.waiting_for_create_confirm)
+            await state.update_data(pending_lead_data=lead_payload)
+            await message.answer(confirm_text, reply_markup=get_voice_confirm_keyboard(data_type="lead"), parse_mode="HTML")
+            return
+
         elif action == "note" and lead_data.get("lead_id"):
             lead_id = lead_data["lead_id"]
             note_content = lead_data.get("content", text)
@@ -879,7 +1298,8 @@ async def handle_voice_inactive(message: Message, state: FSMContext):
         else:
             # Default: try AI assistant as fallback
             leads = await get_leads_via_api(user_id=message.from_user.id)
-            response = _sanitize_telegram_html(await ai_assistant.process_query(text, leads))            await message.answer(response, parse_mode="HTML")
+            response = _sanitize_telegram_html(await ai_assistant.process_query(text, leads))
+            await message.answer(response, parse_mode="HTML")
                 
     except Exception as e:
         logger.error(f"Text command processing error: {e}")
@@ -20,12 +20,16 @@ class LeadNote(Base):
     __allow_unmapped__ = True
     
     id: int = mapped_column(Integer, primary_key=True, autoincrement=True)
-    lead_id: int = mapped_column(ForeignKey("leads.id", ondelete="CASCADE"), nullable=False, index=True)
+    # lead_id lookups are served by the composite idx_lead_notes_lead_type
+    # index (see add_note_pinning_and_index migration) via leading-column prefix.
+    lead_id: int = mapped_column(ForeignKey("leads.id", ondelete="CASCADE"), nullable=False)
     author_id: Optional[str] = mapped_column(String(64), nullable=True)
     author_name: Optional[str] = mapped_column(String(128), nullable=True)
     content: str = mapped_column(Text, nullable=False)
     note_type: str = mapped_column(String(32), default="comment")
-    is_pinned: bool = mapped_column(Boolean, default=False, nullable=False, index=True)
+    # Pinned lookups are served by the partial idx_lead_notes_pinned index
+    # (see add_note_pinning_and_index migration), not a plain boolean index.
+    is_pinned: bool = mapped_column(Boolean, default=False, nullable=False)
     created_at: datetime = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(UTC))
     updated_at: datetime = mapped_column(
         DateTime(timezone=True), 
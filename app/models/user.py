@@ -4,7 +4,7 @@ Manager/User model for lead assignment.
 from datetime import datetime, UTC
 from typing import Optional, TYPE_CHECKING
 
-from sqlalchemy import String, Boolean, Integer, DateTime, Enum as SAEnum
+from sqlalchemy import String, Boolean, Integer, DateTime, Enum as SAEnum, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 import enum
 
@@ -59,3 +59,25 @@ class User(Base):
     
     def __repr__(self):
         return f"<User id={self.id} name={self.full_name} role={self.role.value}>"
+
+
+class UserDomain(Base):
+    """
+    Normalized user↔business-domain link.
+
+    Replaces substring matching against the CSV `User.domains` column in
+    assignment queries: an equality join on the indexed `domain` column is
+    both index-servable and free of prefix false positives. The CSV column
+    stays for legacy readers until they migrate.
+    """
+
+    __tablename__ = "user_domains"
+    __allow_unmapped__ = True
+    __table_args__ = (UniqueConstraint("user_id", "domain", name="uq_user_domains_user_domain"),)
+
+    id: int = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: int = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    domain: str = mapped_column(String(32), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<UserDomain user_id={self.user_id} domain={self.domain}>"
@@ -10,17 +10,31 @@ from sqlalchemy.orm import selectinload
 from app.models.lead import Lead, ColdStage, LeadSource, BusinessDomain
 
 
+def _invalidate_voice_leads_cache() -> None:
+    """Drop the voice assistant's cached lead summary after mutations.
+
+    Imported lazily: the repository layer must not pull the AI stack in at
+    module import time (and must keep working if it is unavailable).
+    """
+    try:
+        from app.ai.voice_ai_manager import VoiceAIManager
+        VoiceAIManager.invalidate_leads_cache()
+    except Exception:
+        pass
+
+
 class LeadRepository:
     """Repository for Lead CRUD operations."""
-    
+
     def __init__(self, db: AsyncSession):
         self.db = db
-    
+
     async def create(self, lead: Lead) -> Lead:
         """Create a new lead."""
         self.db.add(lead)
         await self.db.flush()
         await self.db.refresh(lead)
+        _invalidate_voice_leads_cache()
         return lead
     
     async def get_by_id(self, lead_id: int, include_deleted: bool = False) -> Optional[Lead]:
@@ -106,14 +120,16 @@ class LeadRepository:
         """Save lead changes."""
         await self.db.flush()
         await self.db.refresh(lead)
+        _invalidate_voice_leads_cache()
         return lead
-    
+
     async def delete(self, lead: Lead, deleted_by: str = "System") -> None:
         """Soft delete a lead - marks as deleted without removing from DB."""
         lead.is_deleted = True
         lead.deleted_at = datetime.now(UTC)
         lead.deleted_by = deleted_by
         await self.db.flush()
+        _invalidate_voice_leads_cache()
 
     async def restore(self, lead: Lead) -> None:
         """Restore a soft-deleted lead."""
@@ -2,11 +2,17 @@
 from datetime import datetime, UTC
 from typing import Optional
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import nullsfirst
 
-from app.models.user import User, UserRole
+from app.models.user import User, UserDomain, UserRole
+
+# Hot lookups hoisted to module scope: SQLAlchemy's compiled-SQL cache keys
+# on the statement object, so reusing one construct skips the per-call
+# AST-to-SQL compilation that inline select(...) pays every time.
+_GET_BY_TELEGRAM_ID_STMT = select(User).where(User.telegram_id == bindparam("telegram_id"))
+_GET_BY_EMAIL_STMT = select(User).where(User.email == bindparam("email"))
 
 
 class UserRepository:
@@ -20,6 +26,19 @@ class UserRepository:
         result = await self.session.execute(select(User))
         return list(result.scalars().all())
 
+    async def get_domains_map(self) -> dict[int, set[str]]:
+        """Map user_id -> set of domain values from the user_domains table.
+
+        One query for all users; callers doing in-Python domain matching
+        (automation scoring, notification fan-out) use this instead of
+        splitting the legacy CSV ``User.domains`` column.
+        """
+        result = await self.session.execute(select(UserDomain.user_id, UserDomain.domain))
+        domains: dict[int, set[str]] = {}
+        for user_id, domain in result:
+            domains.setdefault(user_id, set()).add(domain)
+        return domains
+
     async def get_round_robin_manager(self, business_domain: str | None = None) -> Optional[User]:
         """
         Return next available manager/admin for auto-assignment.
@@ -38,8 +57,12 @@ class UserRepository:
         )
 
         if business_domain:
-            # domains stored as CSV string like "FIRST,SECOND"
-            stmt = stmt.where(User.domains.ilike(f"%{business_domain}%"))
+            # Equality join on the normalized user_domains table: uses the
+            # domain index and avoids the substring false positives of the
+            # old ilike("%domain%") against the CSV column.
+            stmt = stmt.join(UserDomain, UserDomain.user_id == User.id).where(
+                UserDomain.domain == business_domain
+            )
 
         stmt = stmt.order_by(
             nullsfirst(User.last_lead_assigned_at.asc()),
@@ -47,28 +70,34 @@ class UserRepository:
             User.id.asc(),
         )
 
-        result = await self.session.execute(stmt.limit(1))
+        # SKIP LOCKED: concurrent intake transactions each claim a different
+        # manager row instead of racing on the same one — the caller's
+        # current_leads increment happens in the same transaction while the
+        # row lock is held. (No-op on SQLite, which ignores FOR UPDATE.)
+        stmt = stmt.limit(1).with_for_update(of=User, skip_locked=True)
+
+        result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
     
     async def get_by_id(self, user_id: int) -> Optional[User]:
-        """Get user by ID."""
-        result = await self.session.execute(
-            select(User).where(User.id == user_id)
-        )
-        return result.scalar_one_or_none()
-    
+        """Get user by ID.
+
+        session.get() consults the session identity map first, so repeated
+        lookups of the same user within one request (auth middleware,
+        assignment logic, serializers) cost zero SQL after the first load.
+        """
+        return await self.session.get(User, user_id)
+
     async def get_by_telegram_id(self, telegram_id: str) -> Optional[User]:
         """Get user by Telegram ID."""
         result = await self.session.execute(
-            select(User).where(User.telegram_id == telegram_id)
+            _GET_BY_TELEGRAM_ID_STMT, {"telegram_id": telegram_id}
         )
         return result.scalar_one_or_none()
-    
+
     async def get_by_email(self, email: str) -> Optional[User]:
         """Get user by Email."""
-        result = await self.session.execute(
-            select(User).where(User.email == email)
-        )
+        result = await self.session.execute(_GET_BY_EMAIL_STMT, {"email": email})
         return result.scalar_one_or_none()
     
     async def create(self, user: User) -> User:
@@ -85,6 +114,20 @@ class UserRepository:
         await self.session.flush()
         await self.session.refresh(user)
         return user
+
+    async def save_many(self, users: list[User]) -> list[User]:
+        """Save/update users in bulk (seeding, import jobs).
+
+        Stamps every row from one datetime.now(UTC) call and flushes once,
+        instead of paying a fresh tz-aware datetime plus flush+refresh per
+        user as looped save() calls would.
+        """
+        now = datetime.now(UTC)
+        for user in users:
+            if user.last_lead_assigned_at is None and user.current_leads > 0:
+                user.last_lead_assigned_at = now
+        await self.session.flush()
+        return users
     
     async def delete(self, user: User) -> None:
         """Delete user."""
@@ -8,6 +8,21 @@ from pydantic import BaseModel, Field, field_validator, model_validator
 
 from app.core.sanitization import sanitize_long
 
+# Hoisted out of the validators: these run on every incoming note, so the
+# lookup tables are built once instead of per request.
+_ALLOWED_TYPES = frozenset({
+    "comment", "system", "ai", "general", "contact", "email",
+    "meeting", "problem", "success", "task", "objection",
+})
+_ALIAS_MAP = {
+    "note": "general",
+    "notes": "general",
+    "category": "general",
+    "call": "contact",
+    "meeting_note": "meeting",
+    "issue": "problem",
+}
+
 
 class NoteCreate(BaseModel):
     """Schema for creating a new note."""
@@ -30,24 +45,18 @@ class NoteCreate(BaseModel):
     def normalize_note_type(cls, v: str) -> str:
         if not v:
             return "general"
+        if v in _ALLOWED_TYPES:
+            # Already canonical — the common case skips the string ops.
+            return v
         value = str(v).strip().lower()
-        alias_map = {
-            "note": "general",
-            "notes": "general",
-            "category": "general",
-            "call": "contact",
-            "meeting_note": "meeting",
-            "issue": "problem",
-        }
-        return alias_map.get(value, value)
+        return _ALIAS_MAP.get(value, value)
 
     @model_validator(mode="after")
     def merge_category_into_note_type(self):
         """Backward compatibility: accept 'category' from bot payloads."""
         if self.category and (not self.note_type or self.note_type == "general"):
             normalized = self.normalize_note_type(self.category)
-            allowed = {"comment", "system", "ai", "general", "contact", "email", "meeting", "problem", "success", "task", "objection"}
-            self.note_type = normalized if normalized in allowed else "general"
+            self.note_type = normalized if normalized in _ALLOWED_TYPES else "general"
         return self
 
 
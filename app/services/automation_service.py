@@ -54,9 +54,10 @@ class AutomationService:
         
         # If lead has domain, prioritize managers with that domain
         if lead.business_domain:
+            user_domains = await self.user_repo.get_domains_map()
             domain_managers = [
-                u for u in available_managers 
-                if u.domains and lead.business_domain.value in u.domains.split(",")
+                u for u in available_managers
+                if lead.business_domain.value in user_domains.get(u.id, ())
             ]
             if domain_managers:
                 available_managers = domain_managers
@@ -158,9 +159,10 @@ class AutomationService:
         
         # If lead has domain, notify only matching managers
         if lead.business_domain:
+            user_domains = await self.user_repo.get_domains_map()
             matching = [
                 u for u in active_managers
-                if u.domains and lead.business_domain.value in u.domains.split(",")
+                if lead.business_domain.value in user_domains.get(u.id, ())
             ]
             if matching:
                 active_managers = matching
@@ -204,13 +206,14 @@ class AutomationService:
             available_agents = active_agents
         
         # Score agents based on skill match
+        user_domains = await self.user_repo.get_domains_map() if lead.business_domain else {}
         scored_agents = []
         for agent in available_agents:
             score = 0
-            
+
             # Skill match: domain expertise
-            if lead.business_domain and agent.domains:
-                if lead.business_domain.value in agent.domains.split(","):
+            if lead.business_domain:
+                if lead.business_domain.value in user_domains.get(agent.id, ()):
                     score += 50  # High priority for skill match
             
             # Workload score (less leads = better)
@@ -38,12 +38,22 @@ async def lifespan(app: FastAPI):
         from app.ai.ai_service import AIService
         import asyncio
         asyncio.create_task(AIService().warm_up())
+
+        # Let the voice AI query leads in-process instead of via loopback HTTP
+        from app.core.database import AsyncSessionLocal
+        from app.ai.voice_ai_manager import get_voice_ai
+        get_voice_ai().set_session_factory(AsyncSessionLocal)
     except Exception as e:
         print(f"Warning: Could not create tables: {e}")
     
     yield
-    
+
     # Shutdown
+    from app.ai.voice_ai_manager import get_voice_ai
+    if get_voice_ai.cache_info().currsize:
+        # Only close the singleton if something actually built it —
+        # constructing it here just to tear it down would be wasted work.
+        await get_voice_ai().aclose()
     await engine.dispose()
 
 
@@ -0,0 +1,79 @@
+"""
+Unit Tests — Rule-Based Fallback Scorer
+
+Verifies that the vectorized batch scorer is behaviorally identical to the
+scalar scorer over the entire signal space, so the two paths can never drift.
+"""
+from itertools import product
+from types import SimpleNamespace
+
+import pytest
+
+from app.ai.fallback_scorer import rule_based_score, rule_based_score_batch
+from app.models.lead import BusinessDomain, ColdStage, LeadSource
+
+
+def _all_signal_combinations():
+    """Every combination the scorers branch on.
+
+    message_count values cover each activity bucket plus the bucket
+    boundaries (thresholds 2/5/10); company×position covers all four
+    states behind the derived b2b flag.
+    """
+    return [
+        SimpleNamespace(
+            source=source,
+            message_count=message_count,
+            email=email,
+            phone=phone,
+            company=company,
+            position=position,
+            business_domain=domain,
+            stage=stage,
+        )
+        for source, message_count, email, phone, company, position, domain, stage in product(
+            LeadSource,
+            (0, 2, 3, 5, 7, 10, 15, 100),
+            (None, "lead@example.com"),
+            (None, "+380501112233"),
+            (None, "Acme"),
+            (None, "CTO"),
+            (None, BusinessDomain.FIRST),
+            ColdStage,
+        )
+    ]
+
+
+class TestBatchScalarEquivalence:
+    """rule_based_score_batch must match rule_based_score exactly."""
+
+    def test_batch_matches_scalar_on_all_signal_combinations(self):
+        leads = _all_signal_combinations()
+        assert len(leads) == 3840
+
+        batch = rule_based_score_batch(leads, with_reasons=True)
+        assert len(batch) == len(leads)
+
+        for lead, batched in zip(leads, batch):
+            scalar = rule_based_score(lead)
+            assert batched.score == pytest.approx(scalar.score, abs=1e-9)
+            assert batched.recommendation == scalar.recommendation
+            assert batched.signals == scalar.signals
+            assert batched.reason == scalar.reason
+
+    def test_batch_without_reasons_skips_reason_strings(self):
+        leads = _all_signal_combinations()[:32]
+        batch = rule_based_score_batch(leads)
+        for lead, batched in zip(leads, batch):
+            scalar = rule_based_score(lead, with_reason=False)
+            assert batched.reason is None
+            assert batched.score == pytest.approx(scalar.score, abs=1e-9)
+            assert batched.recommendation == scalar.recommendation
+            assert batched.signals == scalar.signals
+
+    def test_batch_empty_input(self):
+        assert rule_based_score_batch([]) == []
+
+    def test_scores_stay_in_unit_interval(self):
+        batch = rule_based_score_batch(_all_signal_combinations())
+        assert all(0.0 <= s.score <= 1.0 for s in batch)
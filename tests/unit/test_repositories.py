@@ -0,0 +1,156 @@
+"""
+Unit Tests — Repository query optimizations
+
+Covers the single-round-trip sales analytics CTE (including the empty-DB
+row shape), countless pagination via get_all(return_total=False), and the
+bulk save_many path on UserRepository. Runs against the shared in-memory
+SQLite engine from conftest.
+"""
+import pytest
+
+from tests.conftest import TestingSessionLocal
+from app.models.lead import Lead, LeadSource
+from app.models.sale import Sale, SaleStage
+from app.models.user import User, UserRole
+from app.repositories.sale_repo import SaleRepository
+from app.repositories.user_repo import UserRepository
+
+
+async def _seed_sale(db, stage: SaleStage, amount: int = None, manager: User = None) -> Sale:
+    lead = Lead(source=LeadSource.MANUAL, assigned_to_id=manager.id if manager else None)
+    db.add(lead)
+    await db.flush()
+    sale = Sale(lead_id=lead.id, stage=stage, amount=amount)
+    db.add(sale)
+    await db.flush()
+    return sale
+
+
+async def _seed_manager(db, name: str, email: str) -> User:
+    user = User(full_name=name, email=email, role=UserRole.MANAGER, is_active=True)
+    db.add(user)
+    await db.flush()
+    return user
+
+
+class TestSalesAnalyticsCTE:
+    """The combined totals+top-managers query must stay correct on SQLite."""
+
+    async def test_empty_db_returns_zero_totals_and_no_managers(self):
+        async with TestingSessionLocal() as db:
+            analytics = await SaleRepository(db)._compute_sales_analytics()
+
+        assert analytics["total_sales"] == 0
+        assert analytics["paid_sales"] == 0
+        assert analytics["lost_sales"] == 0
+        assert analytics["paid_conversion_rate"] == 0.0
+        assert analytics["total_revenue"] == 0
+        assert analytics["agreement_pipeline_value"] == 0
+        assert analytics["kyc_pipeline_value"] == 0
+        assert analytics["weighted_forecast_revenue"] == 0.0
+        assert [f["count"] for f in analytics["funnel"]] == [0, 0, 0, 0, 0]
+        # The outer join still yields the totals row; the NULL manager
+        # columns must not leak into top_managers.
+        assert analytics["top_managers"] == []
+
+    async def test_totals_and_top_managers(self):
+        async with TestingSessionLocal() as db:
+            alice = await _seed_manager(db, "Alice", "alice@example.com")
+            bob = await _seed_manager(db, "Bob", "bob@example.com")
+
+            # Paid: Alice 2 deals / 300 total, Bob 1 deal / 500.
+            await _seed_sale(db, SaleStage.PAID, amount=100, manager=alice)
+            await _seed_sale(db, SaleStage.PAID, amount=200, manager=alice)
+            await _seed_sale(db, SaleStage.PAID, amount=500, manager=bob)
+
+            # Non-paid pipeline.
+            await _seed_sale(db, SaleStage.NEW)
+            await _seed_sale(db, SaleStage.KYC, amount=50)
+            await _seed_sale(db, SaleStage.AGREEMENT, amount=200)
+            await _seed_sale(db, SaleStage.LOST)
+
+            analytics = await SaleRepository(db)._compute_sales_analytics()
+
+        assert analytics["total_sales"] == 7
+        assert analytics["paid_sales"] == 3
+        assert analytics["lost_sales"] == 1
+        assert analytics["total_revenue"] == 800
+        assert analytics["agreement_pipeline_value"] == 200
+        assert analytics["kyc_pipeline_value"] == 50
+        assert analytics["weighted_forecast_revenue"] == pytest.approx(200 * 0.6 + 50 * 0.3)
+        assert analytics["paid_conversion_rate"] == pytest.approx(round(3 / 7 * 100, 2))
+
+        funnel = {f["stage"]: f["count"] for f in analytics["funnel"]}
+        assert funnel == {
+            SaleStage.NEW: 1,
+            SaleStage.KYC: 1,
+            SaleStage.AGREEMENT: 1,
+            SaleStage.PAID: 3,
+            SaleStage.LOST: 1,
+        }
+
+        # Ordered by paid deals first, then revenue.
+        assert [(m["manager_name"], m["paid_deals"], m["paid_revenue"])
+                for m in analytics["top_managers"]] == [("Alice", 2, 300), ("Bob", 1, 500)]
+
+
+class TestSaleGetAllWithoutTotal:
+    """return_total=False must skip the count but still signal a next page."""
+
+    async def test_page_with_more_rows_available(self):
+        async with TestingSessionLocal() as db:
+            for _ in range(5):
+                await _seed_sale(db, SaleStage.NEW)
+            repo = SaleRepository(db)
+
+            sales, total = await repo.get_all(offset=0, limit=2, return_total=False)
+            assert len(sales) == 2
+            # Lower bound: offset + fetched (limit+1) rows — enough to know
+            # another page exists without running COUNT.
+            assert total == 3
+
+            exact_sales, exact_total = await repo.get_all(offset=0, limit=2)
+            assert exact_total == 5
+            assert [s.id for s in exact_sales] == [s.id for s in sales]
+
+    async def test_last_page_total_is_exact(self):
+        async with TestingSessionLocal() as db:
+            for _ in range(5):
+                await _seed_sale(db, SaleStage.NEW)
+
+            sales, total = await SaleRepository(db).get_all(
+                offset=4, limit=2, return_total=False
+            )
+            assert len(sales) == 1
+            assert total == 5
+
+
+class TestUserSaveMany:
+    """save_many must persist every row with one shared assignment timestamp."""
+
+    async def test_bulk_save_stamps_shared_timestamp(self):
+        async with TestingSessionLocal() as db:
+            repo = UserRepository(db)
+            u1 = await repo.create(User(
+                full_name="A", email="a@example.com", role=UserRole.MANAGER, current_leads=2
+            ))
+            u2 = await repo.create(User(
+                full_name="B", email="b@example.com", role=UserRole.MANAGER, current_leads=3
+            ))
+            u3 = await repo.create(User(
+                full_name="C", email="c@example.com", role=UserRole.MANAGER, current_leads=0
+            ))
+
+            u1.full_name = "A-renamed"
+            saved = await repo.save_many([u1, u2, u3])
+
+            assert saved[0].last_lead_assigned_at is not None
+            assert saved[0].last_lead_assigned_at == saved[1].last_lead_assigned_at
+            # No leads assigned — must not be stamped.
+            assert saved[2].last_lead_assigned_at is None
+            await db.commit()
+
+        async with TestingSessionLocal() as db:
+            fetched = await UserRepository(db).get_by_email("a@example.com")
+            assert fetched is not None
+            assert fetched.full_name == "A-renamed"
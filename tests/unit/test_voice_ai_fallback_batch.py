@@ -0,0 +1,96 @@
+"""
+Unit Tests — Voice AI fallback micro-batching
+
+Concurrent AI fallback queries inside one collection window must share a
+single OpenAI request, and a malformed batch reply must degrade every
+queued query gracefully instead of stranding its future.
+"""
+import asyncio
+import json
+from unittest.mock import AsyncMock
+
+from app.ai.voice_ai_manager import VoiceAIManager
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, payload: dict):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+
+
+def _completion(content) -> dict:
+    return {"choices": [{"message": {"content": json.dumps(content)}}]}
+
+
+def _manager_with_reply(payload: dict) -> VoiceAIManager:
+    manager = VoiceAIManager()
+    manager.openai_api_key = "test-key"
+    manager._fetch_leads = AsyncMock(return_value="ID:1 | Test Lead | NEW")
+    manager._http.post = AsyncMock(return_value=_FakeResponse(200, payload))
+    return manager
+
+
+class TestFallbackMicroBatch:
+
+    async def test_concurrent_queries_share_one_request(self):
+        manager = _manager_with_reply(_completion(["r1", "r2", "r3"]))
+        try:
+            results = await asyncio.gather(
+                manager._ai_fallback("запит 1", user_id=1),
+                manager._ai_fallback("запит 2", user_id=1),
+                manager._ai_fallback("запит 3", user_id=1),
+            )
+        finally:
+            await manager.aclose()
+
+        assert manager._http.post.await_count == 1
+        assert [r["response"] for r in results] == ["r1", "r2", "r3"]
+        assert all(r["success"] for r in results)
+
+    async def test_full_batch_flushes_without_waiting_for_window(self):
+        replies = [f"r{i}" for i in range(8)]
+        manager = _manager_with_reply(_completion(replies))
+        try:
+            results = await asyncio.gather(
+                *(manager._ai_fallback(f"запит {i}", user_id=1) for i in range(8))
+            )
+        finally:
+            await manager.aclose()
+
+        assert manager._http.post.await_count == 1
+        assert [r["response"] for r in results] == replies
+
+    async def test_malformed_reply_degrades_every_query(self):
+        # Model returned a list of the wrong length: no reply can be
+        # attributed, so every future must resolve to the fallback text.
+        manager = _manager_with_reply(_completion(["only one"]))
+        try:
+            results = await asyncio.gather(
+                manager._ai_fallback("запит 1", user_id=1),
+                manager._ai_fallback("запит 2", user_id=1),
+            )
+        finally:
+            await manager.aclose()
+
+        assert len(results) == 2
+        for result in results:
+            assert result["success"] is True
+            assert result["response"] == "Не вдалося обробити запит. Спробуйте ще раз."
+
+    async def test_non_json_reply_degrades_every_query(self):
+        manager = VoiceAIManager()
+        manager.openai_api_key = "test-key"
+        manager._fetch_leads = AsyncMock(return_value="ID:1 | Test Lead | NEW")
+        manager._http.post = AsyncMock(return_value=_FakeResponse(
+            200, {"choices": [{"message": {"content": "not a JSON array"}}]}
+        ))
+        try:
+            results = await asyncio.gather(
+                manager._ai_fallback("запит 1", user_id=1),
+                manager._ai_fallback("запит 2", user_id=1),
+            )
+        finally:
+            await manager.aclose()
+
+        for result in results:
+            assert result["response"] == "Не вдалося обробити запит. Спробуйте ще раз."